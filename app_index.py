@@ -0,0 +1,235 @@
+# app_index.py
+# Index of installed applications for "open <app>" commands.
+#
+# Built once from the application folders (macOS .app bundles, Linux
+# .desktop files, plus JARVIS_LINUX_APPS for anything else) and refreshed
+# in the background when those folders change. Lookup goes:
+#   exact normalized name / alias -> trigram candidates -> edit distance,
+# so a misheard "vs cold" still finds Visual Studio Code without trying
+# (and failing) to launch anything first. Short names only match exactly
+# ("new" is not News): one wrong letter in four is too big a change.
+
+import os
+import re
+import sys
+import shlex
+import threading
+
+MAC_APP_DIRS = [
+    "/Applications",
+    "/Applications/Utilities",
+    "/System/Applications",
+    "/System/Applications/Utilities",
+    "/System/Library/CoreServices",
+    os.path.expanduser("~/Applications"),
+]
+LINUX_DESKTOP_DIRS = [
+    "/usr/share/applications",
+    "/usr/local/share/applications",
+    os.path.expanduser("~/.local/share/applications"),
+    "/var/lib/flatpak/exports/share/applications",
+]
+# Extra Linux apps as "name=command" or just "command", comma separated
+LINUX_APPS = os.getenv("JARVIS_LINUX_APPS", "")
+
+# Spoken names that do not look like the real app name
+ALIASES = {
+    "chrome": "google chrome",
+    "vs code": "visual studio code",
+    "vscode": "visual studio code",
+    "code": "visual studio code",
+    "settings": "system settings",
+    "itunes": "music",
+}
+
+REFRESH_SEC = 60
+MIN_SCORE = 0.65  # similarity needed for a fuzzy hit
+MIN_SCORE_SHORT = 0.9  # ... for queries of SHORT_QUERY_LEN characters or less
+SHORT_QUERY_LEN = 5
+
+_lock = threading.Lock()
+_apps = {}  # normalized name -> {"name", "launch": [argv]}
+_trigrams = {}  # trigram -> set of normalized names
+_dir_mtimes = {}
+_built = False
+_stop_event = threading.Event()
+_thread = None
+
+
+def normalize(name: str) -> str:
+    name = re.sub(r"\.(app|desktop)$", "", (name or "").lower())
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+def _grams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+# ================== SCANNING ==================
+def _scan_mac() -> dict:
+    apps = {}
+    for folder in MAC_APP_DIRS:
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            continue
+        for fname in names:
+            if fname.endswith(".app"):
+                key = normalize(fname)
+                apps.setdefault(key, {"name": fname[:-4], "launch": ["open", os.path.join(folder, fname)]})
+    return apps
+
+
+def _read_desktop_file(path: str):
+    name = exec_line = None
+    hidden = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            in_entry = False
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and line.startswith("Name=") and name is None:
+                    name = line[5:]
+                elif in_entry and line.startswith("Exec=") and exec_line is None:
+                    exec_line = line[5:]
+                elif in_entry and line in ("NoDisplay=true", "Hidden=true"):
+                    hidden = True
+    except OSError:
+        return None
+    if hidden or not name or not exec_line:
+        return None
+    # Drop field codes like %U / %f
+    argv = [a for a in shlex.split(exec_line) if not re.fullmatch(r"%\w", a)]
+    return {"name": name, "launch": argv} if argv else None
+
+
+def _scan_linux() -> dict:
+    apps = {}
+    for folder in LINUX_DESKTOP_DIRS:
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            continue
+        for fname in names:
+            if fname.endswith(".desktop"):
+                entry = _read_desktop_file(os.path.join(folder, fname))
+                if entry:
+                    apps.setdefault(normalize(entry["name"]), entry)
+    for item in LINUX_APPS.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, command = item.partition("=")
+        command = command or name
+        apps[normalize(name)] = {"name": name.strip(), "launch": shlex.split(command)}
+    return apps
+
+
+def _watched_dirs():
+    return MAC_APP_DIRS if sys.platform == "darwin" else LINUX_DESKTOP_DIRS
+
+
+def _current_mtimes() -> dict:
+    mtimes = {}
+    for folder in _watched_dirs():
+        try:
+            mtimes[folder] = os.stat(folder).st_mtime
+        except OSError:
+            pass
+    return mtimes
+
+
+def rebuild():
+    """Rescan application folders and swap in the new index."""
+    global _apps, _trigrams, _dir_mtimes, _built
+    mtimes = _current_mtimes()
+    apps = _scan_mac() if sys.platform == "darwin" else _scan_linux()
+    # Aliases point at real entries, so they take part in fuzzy matching too
+    for alias, target in ALIASES.items():
+        if target in apps and alias not in apps:
+            apps[alias] = apps[target]
+    trigrams = {}
+    for key in apps:
+        for g in _grams(key):
+            trigrams.setdefault(g, set()).add(key)
+    with _lock:
+        _apps, _trigrams, _dir_mtimes = apps, trigrams, mtimes
+        _built = True
+    print(f"[APPS] Indexed {len(apps)} app names")
+
+
+# ================== LOOKUP ==================
+def lookup(spoken: str, fuzzy: bool = True):
+    """Best matching app {"name", "launch"} for a spoken name, or None."""
+    if not _built:
+        rebuild()
+    query = normalize(spoken)
+    if not query:
+        return None
+
+    with _lock:
+        apps, trigrams = _apps, _trigrams
+    if query in apps:
+        return apps[query]
+    if not fuzzy:
+        return None
+
+    # Candidates share at least one trigram; score by the better of
+    # trigram overlap and edit distance
+    q_grams = _grams(query)
+    candidates = set()
+    for g in q_grams:
+        candidates |= trigrams.get(g, set())
+    best, best_score = None, 0.0
+    for key in candidates:
+        k_grams = _grams(key)
+        jaccard = len(q_grams & k_grams) / len(q_grams | k_grams)
+        dist = edit_distance(query, key)
+        score = max(jaccard, 1 - dist / max(len(query), len(key)))
+        if score > best_score:
+            best, best_score = key, score
+    cutoff = MIN_SCORE_SHORT if len(query) <= SHORT_QUERY_LEN else MIN_SCORE
+    return apps[best] if best_score >= cutoff else None
+
+
+# ================== BACKGROUND REFRESH ==================
+def _loop():
+    if not _built:
+        rebuild()
+    while not _stop_event.wait(REFRESH_SEC):
+        try:
+            if _current_mtimes() != _dir_mtimes:
+                rebuild()
+        except Exception as e:
+            print("[APPS] Refresh error:", e)
+
+
+def start():
+    """Build the index and watch the app folders (no-op if already running)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(target=_loop, daemon=True, name="jarvis-app-index")
+    _thread.start()
+
+
+def stop(timeout: float = 5.0):
+    global _thread
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout=timeout)
+    _thread = None
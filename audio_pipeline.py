@@ -0,0 +1,161 @@
+# audio_pipeline.py
+# One continuous microphone capture shared by wake word detection, voice
+# activity detection and command recording.
+#
+# A single thread reads fixed-size frames from PyAudio into a ring buffer.
+# Every frame gets a sequence number, so readers can follow the stream from
+# any point still in the buffer. The wake word loop and the command recorder
+# read the same frames: command audio starts at the frame right after the
+# keyword, and the microphone is never reopened between commands.
+
+import time
+import threading
+from collections import deque
+
+import pyaudio
+
+import vad
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512  # samples per frame (Porcupine's frame length)
+BUFFER_SECONDS = 30
+
+# Energy threshold for the VAD fallback: louder than noise floor * this
+NOISE_MULTIPLIER = 3.0
+
+_cond = threading.Condition()
+_buffer = deque()  # (seq, pcm bytes)
+_next_seq = 0
+_noise_floor = None
+_state = {"pa": None, "stream": None, "thread": None, "running": False}
+
+
+def frame_duration() -> float:
+    return FRAME_LENGTH / float(SAMPLE_RATE)
+
+
+def _update_noise_floor(energy: float):
+    """Track background noise: fall fast, rise slowly."""
+    global _noise_floor
+    if _noise_floor is None or energy < _noise_floor:
+        _noise_floor = energy
+    else:
+        _noise_floor = 0.995 * _noise_floor + 0.005 * energy
+
+
+def speech_threshold() -> float:
+    return max(vad.MIN_SPEECH_ENERGY, (_noise_floor or 0.0) * NOISE_MULTIPLIER)
+
+
+# ================== CAPTURE THREAD ==================
+def _capture_loop():
+    global _next_seq
+    stream = _state["stream"]
+    while _state["running"]:
+        try:
+            pcm = stream.read(FRAME_LENGTH, exception_on_overflow=False)
+        except Exception as e:
+            print("[AUDIO] Capture error:", e)
+            time.sleep(0.05)
+            continue
+        _update_noise_floor(vad.rms(pcm))
+        with _cond:
+            _buffer.append((_next_seq, pcm))
+            _next_seq += 1
+            _cond.notify_all()
+
+
+def start(sample_rate: int = None, frame_length: int = None):
+    """Open the microphone once and start the capture thread."""
+    global SAMPLE_RATE, FRAME_LENGTH, _buffer
+    if _state["running"]:
+        return
+    SAMPLE_RATE = sample_rate or SAMPLE_RATE
+    FRAME_LENGTH = frame_length or FRAME_LENGTH
+    max_frames = int(BUFFER_SECONDS / frame_duration())
+    _buffer = deque(maxlen=max_frames)
+
+    pa = pyaudio.PyAudio()
+    stream = pa.open(
+        rate=SAMPLE_RATE,
+        channels=1,
+        format=pyaudio.paInt16,
+        input=True,
+        frames_per_buffer=FRAME_LENGTH,
+    )
+    _state.update(pa=pa, stream=stream, running=True)
+    thread = threading.Thread(target=_capture_loop, daemon=True, name="jarvis-audio")
+    _state["thread"] = thread
+    thread.start()
+    print(f"[AUDIO] Capture started ({SAMPLE_RATE} Hz, {FRAME_LENGTH} samples/frame).")
+
+
+def stop():
+    """Stop capturing and release the microphone."""
+    if not _state["running"]:
+        return
+    _state["running"] = False
+    if _state["thread"] is not None:
+        _state["thread"].join(timeout=1.0)
+    try:
+        _state["stream"].stop_stream()
+        _state["stream"].close()
+    finally:
+        _state["pa"].terminate()
+    with _cond:
+        _cond.notify_all()
+    print("[AUDIO] Capture stopped.")
+
+
+# ================== READERS ==================
+def current_seq() -> int:
+    """Sequence number of the next frame to be captured."""
+    with _cond:
+        return _next_seq
+
+
+def frames_from(seq: int, timeout: float = None):
+    """
+    Yield (seq, pcm) from seq onwards, blocking for new frames.
+    If seq has already fallen out of the ring buffer the reader jumps to the
+    oldest frame still available. Stops when capture stops or no frame
+    arrives within timeout seconds.
+    """
+    while True:
+        with _cond:
+            while seq >= _next_seq:
+                if not _state["running"]:
+                    return
+                if not _cond.wait(timeout):
+                    return
+            oldest = _buffer[0][0]
+            if seq < oldest:
+                seq = oldest
+            pcm = _buffer[seq - oldest][1]
+        yield seq, pcm
+        seq += 1
+
+
+def record_command(start_seq: int, timeout: float = 6, phrase_time_limit: float = 15, on_frame=None):
+    """
+    Record one command from the ring buffer, starting at start_seq.
+    The VAD endpointer waits up to `timeout` seconds for speech, then
+    records until trailing silence (phrase_time_limit is a safety cap).
+    on_frame(pcm) is called for every chunk kept (streaming recognizers).
+    Returns the PCM bytes (b"" if nobody spoke).
+    """
+    endpointer = vad.Endpointer(
+        SAMPLE_RATE,
+        timeout=timeout,
+        phrase_time_limit=phrase_time_limit,
+        energy_threshold=speech_threshold(),
+    )
+    kept = []
+    for _, pcm in frames_from(start_seq, timeout=1.0):
+        for chunk in endpointer.feed(pcm):
+            kept.append(chunk)
+            if on_frame:
+                on_frame(chunk)
+        if endpointer.finished:
+            break
+    return b"".join(kept)
@@ -0,0 +1,235 @@
+# cache.py
+# Shared response cache for skills that call external APIs (weather, news,
+# Wikipedia, web search).
+#
+# - Keyed by skill + normalized query ("Weather in  Delhi?" == "weather in delhi").
+# - Per-skill freshness (SKILL_POLICIES). A fresh entry is returned directly.
+#   An expired entry still inside its stale window is returned immediately
+#   while one background thread re-fetches it (stale-while-revalidate).
+# - Concurrent misses for the same key share one upstream call.
+# - Only successful results are stored: fetch functions raise or return
+#   None on failure, and neither is cached.
+# - Two tiers: an in-memory LRU, plus a size-bounded on-disk tier (one JSON
+#   file per entry) so answers survive a restart. Short-lived entries stay
+#   in memory only.
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.getenv("JARVIS_CACHE_DIR", "response_cache")
+MAX_DISK_BYTES = int(float(os.getenv("JARVIS_CACHE_MAX_MB", "20")) * 1024 * 1024)
+MAX_MEMORY_ENTRIES = 256
+# Entries fresher than this many seconds are not worth writing to disk
+DISK_MIN_TTL_SEC = 60
+
+# skill -> (fresh for N seconds, then served stale for up to M more seconds)
+SKILL_POLICIES = {
+    "news": (600, 1800),
+    "weather": (300, 900),
+    "wiki": (86400, 7 * 86400),
+    "web_search": (1800, 3600),
+}
+DEFAULT_POLICY = (300, 300)
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # full key -> {"value", "stored"}
+_inflight = {}  # full key -> Event set when the fetch finishes
+_refreshing = set()
+_invalidated = {}  # skill (or "*") -> entries stored before this are ignored
+_stats = {"hits": 0, "stale": 0, "misses": 0, "errors": 0}
+
+
+def normalize(text) -> str:
+    """Lowercase, drop punctuation, collapse spaces."""
+    text = re.sub(r"[^\w\s]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+def _full_key(skill: str, key) -> str:
+    return f"{skill}:{normalize(key)}"
+
+
+# ================== DISK TIER ==================
+def _disk_path(full_key: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha1(full_key.encode("utf-8")).hexdigest() + ".json")
+
+
+def _disk_get(full_key: str):
+    path = _disk_path(full_key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)  # mark as recently used for eviction
+    except (OSError, ValueError):
+        return None
+    if entry.get("key") != full_key:
+        return None
+    return {"value": entry["value"], "stored": entry["stored"]}
+
+
+def _disk_put(full_key: str, entry: dict):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _disk_path(full_key)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": full_key, "value": entry["value"], "stored": entry["stored"]}, f)
+        os.replace(tmp, path)
+        _disk_evict()
+    except (OSError, TypeError, ValueError) as e:
+        print("[CACHE] Disk write failed:", e)
+
+
+def _disk_evict():
+    """Delete least recently used files until the folder fits MAX_DISK_BYTES."""
+    files = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    if total <= MAX_DISK_BYTES:
+        return
+    for _, size, path in sorted(files):
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        if total <= MAX_DISK_BYTES:
+            break
+
+
+# ================== MEMORY TIER ==================
+def _get_entry(full_key: str):
+    with _lock:
+        entry = _memory.get(full_key)
+        if entry is not None:
+            _memory.move_to_end(full_key)
+            return entry
+    entry = _disk_get(full_key)
+    if entry is not None:
+        _remember(full_key, entry)
+    return entry
+
+
+def _remember(full_key: str, entry: dict):
+    with _lock:
+        _memory[full_key] = entry
+        _memory.move_to_end(full_key)
+        while len(_memory) > MAX_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _store(skill: str, full_key: str, value):
+    entry = {"value": value, "stored": time.time()}
+    _remember(full_key, entry)
+    if SKILL_POLICIES.get(skill, DEFAULT_POLICY)[0] >= DISK_MIN_TTL_SEC:
+        _disk_put(full_key, entry)
+
+
+# ================== FETCHING ==================
+def _fetch_and_store(skill: str, full_key: str, fetch):
+    """Run fetch once per key at a time; other callers wait for its result."""
+    with _lock:
+        pending = _inflight.get(full_key)
+        if pending is None:
+            pending = _inflight[full_key] = threading.Event()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        pending.wait()
+        entry = _get_entry(full_key)
+        if entry is None:
+            # The shared fetch failed; try ourselves so the caller sees the error
+            value = fetch()
+            if value is not None:
+                _store(skill, full_key, value)
+            return value
+        return entry["value"]
+
+    try:
+        value = fetch()
+        if value is not None:
+            _store(skill, full_key, value)
+        return value
+    finally:
+        with _lock:
+            _inflight.pop(full_key, None)
+        pending.set()
+
+
+def _revalidate(skill: str, full_key: str, fetch):
+    try:
+        _fetch_and_store(skill, full_key, fetch)
+    except Exception as e:
+        _stats["errors"] += 1
+        print(f"[CACHE] Background refresh of {full_key} failed:", e)
+    finally:
+        with _lock:
+            _refreshing.discard(full_key)
+
+
+def cached(skill: str, key, fetch):
+    """
+    Return fetch() for (skill, key), answering from cache when possible.
+    fetch() must return a JSON-serializable value, or None / raise on failure.
+    """
+    full_key = _full_key(skill, key)
+    fresh_sec, stale_sec = SKILL_POLICIES.get(skill, DEFAULT_POLICY)
+    entry = _get_entry(full_key)
+    cutoff = max(_invalidated.get(skill, 0), _invalidated.get("*", 0))
+    if entry is not None and entry["stored"] < cutoff:
+        entry = None
+
+    if entry is not None:
+        age = time.time() - entry["stored"]
+        if age <= fresh_sec:
+            _stats["hits"] += 1
+            return entry["value"]
+        if age <= fresh_sec + stale_sec:
+            _stats["stale"] += 1
+            with _lock:
+                start = full_key not in _refreshing
+                _refreshing.add(full_key)
+            if start:
+                threading.Thread(
+                    target=_revalidate, args=(skill, full_key, fetch), daemon=True
+                ).start()
+            return entry["value"]
+
+    _stats["misses"] += 1
+    try:
+        return _fetch_and_store(skill, full_key, fetch)
+    except Exception:
+        _stats["errors"] += 1
+        raise
+
+
+def invalidate(skill: str = None):
+    """Forget everything cached so far (all skills, or one skill)."""
+    now = time.time()
+    with _lock:
+        if skill is None:
+            _memory.clear()
+            _invalidated["*"] = now
+            return
+        _invalidated[skill] = now
+        for full_key in [k for k in _memory if k.startswith(skill + ":")]:
+            del _memory[full_key]
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, entries=len(_memory))
@@ -0,0 +1,148 @@
+# conversation.py
+# Per-session chat history for the GPT fallback, so follow-ups ("and his
+# age?") work without restating everything.
+#
+# Layout of every request (prefix-stable, so provider-side prompt caching
+# can reuse as much of it as possible):
+#   [fixed system prompt] [summary of older turns] [recent turns...] [new prompt]
+# New turns are only ever appended. When the recent turns grow past
+# COMPACT_AT_TOKENS, the oldest half is folded into the summary in the
+# background - in one batch, so the prefix changes once per compaction
+# instead of on every turn. If a request is still over TOKEN_BUDGET before
+# that finishes, the oldest turns are left out of that request only.
+
+import os
+import time
+import threading
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+DEFAULT_SESSION = "default"
+SYSTEM_PROMPT = (
+    "You are JARVIS, a personal voice assistant. Replies are spoken aloud, "
+    "so answer in one to three short sentences without markdown."
+)
+TOKEN_BUDGET = int(os.getenv("JARVIS_HISTORY_TOKENS", "1200"))
+COMPACT_AT_TOKENS = int(TOKEN_BUDGET * 0.75)
+MAX_TURNS = 40  # hard cap on stored messages per session
+MAX_SESSIONS = 32
+SESSION_IDLE_SEC = 30 * 60  # a session untouched this long starts fresh
+SUMMARY_MAX_CHARS = 1200
+
+_lock = threading.Lock()
+_sessions = {}  # session id -> {"summary", "turns", "last_used", "compacting"}
+_summarizer = None
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)  # rough: ~4 characters per token
+
+
+def _message_tokens(msg: dict) -> int:
+    return count_tokens(msg["content"]) + 4  # role / framing overhead
+
+
+def set_summarizer(fn):
+    """fn(previous_summary, turns) -> new summary string (e.g. a cheap GPT call)."""
+    global _summarizer
+    _summarizer = fn
+
+
+def _fallback_summary(previous: str, turns) -> str:
+    """Extractive summary when no summarizer is set or it fails."""
+    lines = previous.splitlines() if previous else []
+    for msg in turns:
+        who = "User" if msg["role"] == "user" else "JARVIS"
+        lines.append(f"{who}: {msg['content'][:160]}")
+    # Oldest lines go first once it is too long
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) > SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def _session(session_id: str) -> dict:
+    now = time.time()
+    state = _sessions.get(session_id)
+    if state is None or now - state["last_used"] > SESSION_IDLE_SEC:
+        state = {"summary": "", "turns": [], "last_used": now, "compacting": False}
+        _sessions[session_id] = state
+        if len(_sessions) > MAX_SESSIONS:
+            oldest = min(_sessions, key=lambda k: _sessions[k]["last_used"])
+            del _sessions[oldest]
+    state["last_used"] = now
+    return state
+
+
+def history(session_id: str = DEFAULT_SESSION) -> list:
+    """Messages to send before the new user prompt, within TOKEN_BUDGET."""
+    with _lock:
+        state = _session(session_id or DEFAULT_SESSION)
+        summary = state["summary"]
+        turns = list(state["turns"])
+
+    head = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if summary:
+        head.append({"role": "system", "content": "Earlier in this conversation:\n" + summary})
+
+    budget = TOKEN_BUDGET - sum(_message_tokens(m) for m in head)
+    used = sum(_message_tokens(m) for m in turns)
+    # Compaction has not caught up: leave out the oldest turns, in pairs
+    while turns and used > budget:
+        for _ in range(min(2, len(turns))):
+            used -= _message_tokens(turns.pop(0))
+    return head + turns
+
+
+def record(session_id: str, prompt: str, reply: str):
+    """Append one exchange; compacts older turns in the background if needed."""
+    session_id = session_id or DEFAULT_SESSION
+    with _lock:
+        state = _session(session_id)
+        state["turns"].append({"role": "user", "content": prompt})
+        state["turns"].append({"role": "assistant", "content": reply})
+        if len(state["turns"]) > MAX_TURNS:
+            # Summarizer is far behind; drop instead of growing without bound
+            del state["turns"][: len(state["turns"]) - MAX_TURNS]
+        used = sum(_message_tokens(m) for m in state["turns"])
+        start = used > COMPACT_AT_TOKENS and not state["compacting"] and len(state["turns"]) >= 4
+        if start:
+            state["compacting"] = True
+    if start:
+        threading.Thread(target=_compact, args=(session_id,), daemon=True).start()
+
+
+def _compact(session_id: str):
+    """Fold the oldest half of the turns into the summary."""
+    with _lock:
+        state = _sessions.get(session_id)
+        if state is None:
+            return
+        n = (len(state["turns"]) // 2) & ~1  # whole user/assistant pairs
+        old_turns = state["turns"][:n]
+        previous = state["summary"]
+    try:
+        summary = _summarizer(previous, old_turns) if _summarizer else None
+    except Exception as e:
+        print("[CONVERSATION] Summarizer failed:", e)
+        summary = None
+    if not summary:
+        summary = _fallback_summary(previous, old_turns)
+
+    with _lock:
+        # Turns appended meanwhile are kept; only the folded ones go
+        if state["turns"][:n] == old_turns:
+            del state["turns"][:n]
+            state["summary"] = summary[-SUMMARY_MAX_CHARS:]
+        state["compacting"] = False
+    print(f"[CONVERSATION] Compacted {n} messages of session {session_id!r}")
+
+
+def reset(session_id: str = DEFAULT_SESSION):
+    with _lock:
+        _sessions.pop(session_id or DEFAULT_SESSION, None)
@@ -0,0 +1,307 @@
+# cricket.py
+# Live cricket tracker (CricketData currentMatches API).
+#
+# One background thread polls the match list rarely (CRICKET_IDLE_POLL_SEC,
+# or when a followed match is due to start) and fast (CRICKET_POLL_SEC)
+# only while a followed match is live, keeping parsed match state indexed
+# by team name. Calls are counted against CRICKET_DAILY_CALLS (the free
+# CricketData plan allows 100 a day): when the budget runs low the live
+# interval stretches so the rest of the day still fits. Between polls it diffs the
+# followed matches and announces only what changed (wicket, team
+# milestone, result) through the speech queue and the HUD event bus.
+# Voice commands read the local state, so "cricket score" answers instantly.
+#
+# Followed matches: any involving a team in CRICKET_FOLLOW_TEAMS, plus any
+# match the user asks about.
+
+import os
+import time
+import datetime
+import threading
+
+import http_client
+import events
+import speech
+
+API_URL = "https://api.cricapi.com/v1/currentMatches"
+POLL_LIVE_SEC = float(os.getenv("CRICKET_POLL_SEC", "30"))
+POLL_IDLE_SEC = float(os.getenv("CRICKET_IDLE_POLL_SEC", str(4 * 3600)))
+DAILY_CALLS = int(os.getenv("CRICKET_DAILY_CALLS", "100"))
+FOLLOW_TEAMS = [t.strip().lower() for t in os.getenv("CRICKET_FOLLOW_TEAMS", "india").split(",") if t.strip()]
+MILESTONE_RUNS = 50  # announce every 50 team runs
+
+_lock = threading.Lock()
+_api_key = None
+_matches = {}  # match id -> parsed state
+_by_team = {}  # lowercased team name -> [match ids]
+_followed = set()
+_last_poll = 0.0
+_calls = {"day": None, "count": 0}  # API calls made today (UTC)
+_stop_event = threading.Event()
+_wake = threading.Event()  # cut an idle wait short (user started following a match)
+_thread = None
+
+
+# ================== PARSING ==================
+def _num(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _first(d: dict, *keys, default="?"):
+    """First of keys present in d (0 counts as present)."""
+    for key in keys:
+        if d.get(key) is not None:
+            return d[key]
+    return default
+
+
+def _start_time(m: dict):
+    """Scheduled start as a unix timestamp, or None."""
+    raw = m.get("dateTimeGMT")
+    if not raw:
+        return None
+    try:
+        start = datetime.datetime.fromisoformat(str(raw).replace("Z", ""))
+    except ValueError:
+        return None
+    return start.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def parse_match(m: dict) -> dict:
+    """Normalize one API match (field names vary between API versions)."""
+    teams = m.get("teams") or m.get("team") or []
+    if not isinstance(teams, list):
+        teams = [str(teams)]
+
+    # Score may be a list or single dict or nested under a key
+    raw_score = m.get("score") or m.get("scorecard") or m.get("score_full") or []
+    if isinstance(raw_score, dict):
+        raw_score = [raw_score]
+
+    innings = []
+    for inn in raw_score if isinstance(raw_score, list) else []:
+        innings.append({
+            "name": inn.get("inning") or inn.get("inningName") or inn.get("team") or "",
+            "runs": _first(inn, "r", "runs"),
+            "wickets": _first(inn, "w", "wickets"),
+            "overs": _first(inn, "o", "overs"),
+        })
+
+    name = m.get("name") or m.get("match") or "A cricket match"
+    return {
+        "id": str(m.get("id") or name),
+        "name": name,
+        "status": m.get("status") or m.get("matchStatus") or m.get("match_status") or "",
+        "teams": teams,
+        "innings": innings,
+        "started": bool(m.get("matchStarted", True)),
+        "ended": bool(m.get("matchEnded", False)),
+        "starts_at": _start_time(m),
+    }
+
+
+def format_match(match: dict) -> str:
+    parts = []
+    for inn in match["innings"]:
+        score = f"{inn['runs']}/{inn['wickets']} in {inn['overs']} overs"
+        parts.append(f"{inn['name']}: {score}" if inn["name"] else score)
+    score_text = " | ".join(parts) if parts else "Score details are not available yet, sir."
+    if match["status"]:
+        return f"{match['name']}. {score_text}. Status: {match['status']}."
+    return f"{match['name']}. {score_text}."
+
+
+# ================== DIFFING ==================
+def diff_match(old: dict, new: dict) -> list:
+    """Changed events between two states of one match: [(kind, text)]."""
+    found = []
+    old_innings = {inn["name"]: inn for inn in old["innings"]}
+    for inn in new["innings"]:
+        prev = old_innings.get(inn["name"])
+        if prev is None:
+            continue
+        runs, prev_runs = _num(inn["runs"]), _num(prev["runs"])
+        wkts, prev_wkts = _num(inn["wickets"]), _num(prev["wickets"])
+        score = f"{inn['runs']}/{inn['wickets']} in {inn['overs']} overs"
+        if wkts is not None and prev_wkts is not None and wkts > prev_wkts:
+            found.append(("wicket", f"Wicket! {inn['name'] or new['name']} {score}."))
+        if runs is not None and prev_runs is not None:
+            if int(runs // MILESTONE_RUNS) > int(prev_runs // MILESTONE_RUNS):
+                milestone = int(runs // MILESTONE_RUNS) * MILESTONE_RUNS
+                found.append(("milestone", f"{inn['name'] or new['name']} reach {milestone}. {score}."))
+    if new["ended"] and not old["ended"]:
+        found.append(("result", f"{new['name']}: {new['status'] or 'match over'}."))
+    return found
+
+
+def _is_followed(match: dict) -> bool:
+    if match["id"] in _followed:
+        return True
+    text = " ".join([match["name"]] + match["teams"]).lower()
+    return any(team in text for team in FOLLOW_TEAMS)
+
+
+# ================== POLLING ==================
+def _today() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
+
+
+def _calls_left() -> int:
+    with _lock:
+        if _calls["day"] != _today():
+            _calls.update(day=_today(), count=0)
+        return DAILY_CALLS - _calls["count"]
+
+
+def _fetch():
+    if _calls_left() <= 0:
+        print("[CRICKET] Daily API budget used up, skipping poll")
+        return None
+    with _lock:
+        _calls["count"] += 1
+    # No automatic retries: each one would be another call against the quota
+    response = http_client.get(API_URL, params={"apikey": _api_key, "offset": 0}, retries=0)
+    if response.status_code == 429:
+        print("[CRICKET] API quota exhausted (429), pausing until tomorrow")
+        with _lock:
+            _calls["count"] = DAILY_CALLS
+        return None
+    data = response.json()
+    if data.get("status") not in (None, "success"):
+        print("[CRICKET] API error:", data.get("status"), data.get("reason", ""))
+        return None
+    # Different APIs might use different keys; try to be defensive.
+    return data.get("data") or data.get("matches") or []
+
+
+def refresh(announce: bool = True) -> bool:
+    """Poll once, update state, announce changes. False if the poll failed."""
+    global _last_poll
+    try:
+        raw = _fetch()
+    except Exception as e:
+        print("[CRICKET] Poll failed:", e)
+        return False
+    if raw is None:
+        return False
+
+    changes = []
+    with _lock:
+        first_poll = not _matches
+        matches = {}
+        by_team = {}
+        for m in raw:
+            match = parse_match(m)
+            matches[match["id"]] = match
+            for team in match["teams"]:
+                by_team.setdefault(team.lower(), []).append(match["id"])
+            old = _matches.get(match["id"])
+            if old is not None and _is_followed(match):
+                changes.extend((match, kind, text) for kind, text in diff_match(old, match))
+        _matches.clear()
+        _matches.update(matches)
+        _by_team.clear()
+        _by_team.update(by_team)
+        _last_poll = time.time()
+
+    # Nothing to diff against on the very first poll
+    if announce and not first_poll:
+        for match, kind, text in changes:
+            print(f"[CRICKET] {kind}: {text}")
+            events.publish("cricket", {"kind": kind, "match": match["name"], "text": text})
+            speech.say(text)
+    return True
+
+
+def _any_followed_live() -> bool:
+    with _lock:
+        return any(m["started"] and not m["ended"] and _is_followed(m) for m in _matches.values())
+
+
+def _next_wait() -> float:
+    """Seconds until the next poll."""
+    now = time.time()
+    if _any_followed_live():
+        # Spread the remaining budget over the rest of the (UTC) day
+        midnight = datetime.datetime.now(datetime.timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+        left = max(1, _calls_left())
+        return max(POLL_LIVE_SEC, (midnight.timestamp() - now) / left)
+    wait = POLL_IDLE_SEC
+    with _lock:
+        # Wake up when a followed match is due to start
+        for m in _matches.values():
+            if not m["started"] and m["starts_at"] and m["starts_at"] > now and _is_followed(m):
+                wait = min(wait, m["starts_at"] - now + 60)
+    return wait
+
+
+def _loop():
+    while not _stop_event.is_set():
+        refresh()
+        _wake.wait(_next_wait())
+        _wake.clear()
+
+
+def start(api_key: str):
+    """Start background polling (no-op if already running)."""
+    global _api_key, _thread
+    _api_key = api_key
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _wake.clear()
+    _thread = threading.Thread(target=_loop, daemon=True, name="jarvis-cricket")
+    _thread.start()
+
+
+def stop(timeout: float = 5.0):
+    global _thread
+    _stop_event.set()
+    _wake.set()
+    if _thread is not None:
+        _thread.join(timeout=timeout)
+    _thread = None
+
+
+# ================== QUERIES ==================
+def find_match(text: str):
+    """Match for a team named in text, else the first followed live match, else any."""
+    text = (text or "").lower()
+    with _lock:
+        for team, ids in _by_team.items():
+            if team and team in text:
+                return _matches[ids[0]]
+        live = [m for m in _matches.values() if m["started"] and not m["ended"]]
+        for m in live:
+            if _is_followed(m):
+                return m
+        if live:
+            return live[0]
+        return next(iter(_matches.values()), None)
+
+
+def score_for(cmd: str, api_key: str = None) -> str:
+    """Spoken score for the match the command is about, from local state."""
+    global _api_key
+    if api_key:
+        _api_key = api_key
+    # Tracker not running or its data is old (idle polling): poll once now.
+    # Changes found on the way are announced like any other poll's.
+    if time.time() - _last_poll > POLL_LIVE_SEC and not refresh():
+        if not _matches:
+            return "I tried to fetch the live cricket score, but something went wrong, sir."
+
+    match = find_match(cmd)
+    if match is None:
+        return "I did not find any ongoing match right now, sir."
+    with _lock:
+        # User asked about it, so announce its wickets / result from now on
+        newly_followed = match["id"] not in _followed
+        _followed.add(match["id"])
+    if newly_followed and match["started"] and not match["ended"]:
+        _wake.set()  # switch the tracker to live polling now
+    return format_match(match)
@@ -0,0 +1,149 @@
+# dispatcher.py
+# Runs slow skills (network APIs, GPT, camera) on a bounded thread pool with
+# per-skill deadlines, so one hanging upstream can never hold a request
+# worker hostage.
+#
+# - Result ready before the deadline → returned as the normal reply.
+# - Deadline passed → a quick "still working" reply is returned, and the
+#   final answer is spoken + published on the event bus when it arrives.
+# - Answers arriving after HARD_DEADLINE_SEC are dropped (cancelled), and
+#   jobs that never started can be cancelled with cancel_pending().
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import events
+import speech
+
+SKILL_WORKERS = int(os.getenv("JARVIS_SKILL_WORKERS", "6"))
+
+# Seconds to wait for a skill before replying "still working"
+DEFAULT_DEADLINE_SEC = 5.0
+SKILL_DEADLINES = {
+    "weather": 4.0,
+    "news": 4.0,
+    "cricket": 4.0,
+    "wiki": 4.0,
+    "web_search": 5.0,
+    "youtube": 5.0,
+    "gpt": 8.0,
+    "knowledge": 10.0,
+    "knowledge_reload": 3.0,
+    "study_plan": 8.0,
+    "vision": 8.0,
+    "reminders": 2.0,
+    "system_report": 3.0,
+}
+# Late answers older than this are thrown away instead of being spoken
+HARD_DEADLINE_SEC = 120.0
+
+STILL_WORKING_REPLY = "Still working on that, sir. I will tell you as soon as I have the answer."
+BUSY_REPLY = "All my skill workers are busy right now, sir. Please try again in a moment."
+
+_executor = ThreadPoolExecutor(max_workers=SKILL_WORKERS, thread_name_prefix="jarvis-skill")
+_lock = threading.Lock()
+_inflight = set()
+_late = set()
+_muted = set()
+
+
+def _deliver_late(name: str, started: float, future):
+    with _lock:
+        _late.discard(future)
+        muted = future in _muted
+        _muted.discard(future)
+    if muted or future.cancelled():
+        return
+    elapsed = time.time() - started
+    if elapsed > HARD_DEADLINE_SEC:
+        print(f"[DISPATCH] {name} finished after {elapsed:.1f}s, past hard deadline; dropped.")
+        return
+    try:
+        result = future.result()
+    except Exception as e:
+        print(f"[DISPATCH] {name} failed late:", e)
+        return
+    if not result:
+        return
+    print(f"[DISPATCH] Late result from {name} after {elapsed:.1f}s")
+    events.publish("reply", {"skill": name, "text": result, "late": True})
+    speech.say(result)
+
+
+def _done(future):
+    with _lock:
+        _inflight.discard(future)
+
+
+def _submit(name: str, fn, args, kwargs):
+    """Queue fn on the pool; None if every worker is already busy."""
+    with _lock:
+        if len(_inflight) >= SKILL_WORKERS:
+            print(f"[DISPATCH] Pool saturated, rejecting {name}.")
+            return None
+        future = _executor.submit(fn, *args, **kwargs)
+        _inflight.add(future)
+    future.add_done_callback(_done)
+    return future
+
+
+def _await(name: str, future, started: float) -> str:
+    """Wait until the skill's deadline (counted from started), else answer later."""
+    deadline = SKILL_DEADLINES.get(name, DEFAULT_DEADLINE_SEC)
+    try:
+        return future.result(timeout=max(0.0, started + deadline - time.time()))
+    except FutureTimeout:
+        pass
+    except Exception as e:
+        print(f"[DISPATCH] {name} error:", e)
+        return "Sorry sir, that skill ran into an error."
+
+    print(f"[DISPATCH] {name} passed its {deadline:.0f}s deadline, answering later.")
+    with _lock:
+        _late.add(future)
+    future.add_done_callback(lambda f: _deliver_late(name, started, f))
+    return STILL_WORKING_REPLY
+
+
+def run_skill(name: str, fn, *args, **kwargs) -> str:
+    """
+    Run fn(*args, **kwargs) on the skill pool and wait up to its deadline.
+    Returns the skill's reply, or a "still working" / "busy" reply.
+    """
+    started = time.time()
+    future = _submit(name, fn, args, kwargs)
+    if future is None:
+        return BUSY_REPLY
+    return _await(name, future, started)
+
+
+def run_skills(jobs) -> list:
+    """
+    Run several independent skills at once: jobs = [(name, fn, args), ...].
+    Replies come back in job order; the wait is the slowest skill (each
+    still capped by its own deadline), not the sum.
+    """
+    started = time.time()
+    futures = [_submit(name, fn, args, {}) for name, fn, args in jobs]
+    return [
+        _await(name, future, started) if future is not None else BUSY_REPLY
+        for (name, _, _), future in zip(jobs, futures)
+    ]
+
+
+def cancel_pending() -> int:
+    """Cancel late jobs (not-yet-started ones are removed, running ones muted)."""
+    with _lock:
+        pending = list(_late)
+        _late.clear()
+        for future in pending:
+            if not future.cancel():
+                _muted.add(future)
+    return len(pending)
+
+
+def stats():
+    with _lock:
+        return {"workers": SKILL_WORKERS, "inflight": len(_inflight), "late": len(_late)}
@@ -0,0 +1,47 @@
+# events.py
+# Tiny in-process publish/subscribe bus.
+# Background work (late skill replies, reminders, security alerts, status
+# changes) publishes events here; push channels such as the HUD stream
+# subscribe and forward them. Publishing never blocks: a subscriber that
+# is not keeping up loses its oldest events.
+
+import time
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+_lock = threading.Lock()
+_subscribers = []
+
+
+def subscribe(maxsize: int = SUBSCRIBER_QUEUE_SIZE) -> queue.Queue:
+    """Register a new listener; events arrive on the returned queue."""
+    q = queue.Queue(maxsize=maxsize)
+    with _lock:
+        _subscribers.append(q)
+    return q
+
+
+def unsubscribe(q: queue.Queue):
+    with _lock:
+        if q in _subscribers:
+            _subscribers.remove(q)
+
+
+def publish(kind: str, data=None):
+    """Send an event {"type", "data", "ts"} to every subscriber."""
+    event = {"type": kind, "data": data, "ts": time.time()}
+    with _lock:
+        targets = list(_subscribers)
+    for q in targets:
+        try:
+            q.put_nowait(event)
+        except queue.Full:
+            # Slow consumer: drop its oldest event to make room
+            try:
+                q.get_nowait()
+                q.put_nowait(event)
+            except (queue.Empty, queue.Full):
+                pass
+    return event
@@ -0,0 +1,178 @@
+# http_client.py
+# One outbound HTTP layer for every integration (weather, news, cricket,
+# YouTube, web search).
+#
+# - Keep-alive connection pool shared by all skills. Uses HTTP/2 via httpx
+#   when `httpx` + `h2` are installed, otherwise a pooled requests.Session.
+# - Per-host concurrency limit, so a burst of commands cannot hammer one API.
+# - Retries connection errors, timeouts, 429 and 5xx with jittered
+#   exponential backoff (honours a numeric Retry-After).
+# - Per-host latency metrics (count, errors, p50/p95) via stats().
+#
+# get() returns the backend's response object; both expose .status_code,
+# .text, .json() and .headers.
+
+import os
+import time
+import random
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+except ImportError:
+    httpx = None
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 8)
+MAX_RETRIES = 2
+BACKOFF_BASE_SEC = 0.3
+BACKOFF_MAX_SEC = 4.0
+PER_HOST_LIMIT = int(os.getenv("JARVIS_HTTP_PER_HOST", "4"))
+POOL_SIZE = 20
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+USER_AGENT = "JARVIS/1.0 (+personal assistant)"
+LATENCY_WINDOW = 200  # samples kept per host
+
+_lock = threading.Lock()
+_client = None
+_host_slots = {}
+_latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+_counts = defaultdict(lambda: {"calls": 0, "errors": 0, "retries": 0})
+
+
+# ================== BACKEND ==================
+def _make_client():
+    if httpx is not None:
+        print("[HTTP] Using httpx with HTTP/2")
+        return httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+        )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def _get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            _client = _make_client()
+        return _client
+
+
+def backend_name() -> str:
+    return "httpx" if httpx is not None else "requests"
+
+
+def _retryable_errors():
+    if httpx is not None:
+        return (httpx.TransportError,)
+    return (requests.ConnectionError, requests.Timeout)
+
+
+def _send(client, url, params, headers, timeout):
+    if httpx is not None:
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        return client.get(url, params=params, headers=headers, timeout=httpx.Timeout(read, connect=connect))
+    return client.get(url, params=params, headers=headers, timeout=timeout)
+
+
+def _host_slot(host: str) -> threading.BoundedSemaphore:
+    with _lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return slot
+
+
+def _backoff(attempt: int, response=None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX_SEC)
+    # Full jitter: random point in [0, base * 2^attempt]
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** attempt)))
+
+
+# ================== PUBLIC API ==================
+def get(url: str, params=None, headers=None, timeout=DEFAULT_TIMEOUT, retries: int = MAX_RETRIES):
+    """
+    GET through the shared pool. Raises the backend's exception if every
+    attempt fails; returns the last response if it kept answering 429/5xx.
+    """
+    host = urlparse(url).netloc
+    client = _get_client()
+    errors = _retryable_errors()
+
+    for attempt in range(retries + 1):
+        response = None
+        start = time.perf_counter()
+        try:
+            with _host_slot(host):
+                response = _send(client, url, params, headers, timeout)
+        except errors as e:
+            _record(host, time.perf_counter() - start, ok=False)
+            if attempt >= retries:
+                raise
+            print(f"[HTTP] {host} {type(e).__name__}, retrying...")
+        else:
+            ok = response.status_code not in RETRY_STATUSES
+            _record(host, time.perf_counter() - start, ok=ok)
+            if ok or attempt >= retries:
+                return response
+            print(f"[HTTP] {host} returned {response.status_code}, retrying...")
+
+        with _lock:
+            _counts[host]["retries"] += 1
+        time.sleep(_backoff(attempt, response))
+
+
+def get_json(url: str, **kwargs):
+    return get(url, **kwargs).json()
+
+
+# ================== METRICS ==================
+def _record(host: str, elapsed: float, ok: bool):
+    with _lock:
+        _latencies[host].append(elapsed)
+        _counts[host]["calls"] += 1
+        if not ok:
+            _counts[host]["errors"] += 1
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def stats() -> dict:
+    """Per-host {"calls", "errors", "retries", "p50_ms", "p95_ms"}."""
+    with _lock:
+        out = {}
+        for host, counts in _counts.items():
+            lat = list(_latencies[host])
+            out[host] = dict(counts)
+            if lat:
+                out[host]["p50_ms"] = round(_percentile(lat, 50) * 1000, 1)
+                out[host]["p95_ms"] = round(_percentile(lat, 95) * 1000, 1)
+        return out
+
+
+def close():
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
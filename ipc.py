@@ -0,0 +1,135 @@
+# ipc.py
+# Local IPC channel (Unix domain socket) between the wake word listener and
+# the Jarvis server when both run on the same machine.
+#
+# Protocol: newline-delimited JSON. The client sends
+#   {"message": "what time is it", "speak": true}
+# and gets back {"reply": "..."} on the same connection. Connections stay
+# open, so each command costs one local write + read instead of an HTTP
+# request on a fresh TCP connection.
+
+import os
+import json
+import socket
+import threading
+
+SOCKET_PATH = os.getenv("JARVIS_IPC_SOCKET", "/tmp/jarvis.sock")
+CLIENT_TIMEOUT = 60.0
+
+_client = {"sock": None, "file": None}
+_client_lock = threading.Lock()
+
+
+# ================== SERVER ==================
+def _serve_connection(conn, handler):
+    with conn, conn.makefile("rwb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line.decode("utf-8"))
+                response = handler(request)
+            except Exception as e:
+                print("[IPC] Request error:", e)
+                response = {"error": str(e)}
+            f.write((json.dumps(response) + "\n").encode("utf-8"))
+            f.flush()
+
+
+def _serve_forever(server, handler):
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            break  # socket closed
+        threading.Thread(target=_serve_connection, args=(conn, handler), daemon=True).start()
+
+
+def start_server(handler, path: str = SOCKET_PATH):
+    """
+    Listen on a Unix socket in a background thread.
+    handler(request_dict) -> response_dict runs once per request.
+    Returns the listening socket (close it to stop), or None if unsupported.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        print("[IPC] Unix sockets not supported on this platform.")
+        return None
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        os.chmod(path, 0o600)  # only this user may talk to Jarvis
+        server.listen(8)
+    except OSError as e:
+        print("[IPC] Could not start socket server:", e)
+        return None
+    threading.Thread(target=_serve_forever, args=(server, handler), daemon=True, name="jarvis-ipc").start()
+    print(f"[IPC] Listening on {path}")
+    return server
+
+
+def stop_server(server, path: str = SOCKET_PATH):
+    if server is None:
+        return
+    try:
+        server.close()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ================== CLIENT ==================
+def available(path: str = SOCKET_PATH) -> bool:
+    return hasattr(socket, "AF_UNIX") and os.path.exists(path)
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CLIENT_TIMEOUT)
+    sock.connect(path)
+    _client["sock"] = sock
+    _client["file"] = sock.makefile("rwb")
+
+
+def _close_client():
+    for key in ("file", "sock"):
+        try:
+            if _client[key] is not None:
+                _client[key].close()
+        except OSError:
+            pass
+        _client[key] = None
+
+
+def request(payload: dict, path: str = SOCKET_PATH) -> dict:
+    """
+    Send one request over the persistent connection.
+    A stale connection is re-opened once before sending; a request that was
+    already sent is never repeated (the command could run twice).
+    """
+    data = (json.dumps(payload) + "\n").encode("utf-8")
+    with _client_lock:
+        for attempt in range(2):
+            try:
+                if _client["sock"] is None:
+                    _connect(path)
+                _client["file"].write(data)
+                _client["file"].flush()
+                break
+            except OSError as e:
+                _close_client()
+                if attempt == 1:
+                    raise
+                print("[IPC] Reconnecting:", e)
+
+        try:
+            line = _client["file"].readline()
+        except OSError:
+            _close_client()
+            raise
+        if not line:
+            _close_client()
+            raise ConnectionError("Jarvis IPC server closed the connection")
+        return json.loads(line.decode("utf-8"))
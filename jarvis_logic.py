@@ -1,7 +1,7 @@
 # jarvis_logic.py
 """
 Tiny wrapper so the website can use the same Jarvis brain
-you already wrote in main.py (the handle() function).
+you already wrote in main.py (the handle_command() function).
 """
 
 import main  # this imports your existing main.py
@@ -10,10 +10,10 @@ import main  # this imports your existing main.py
 def handle_command(text: str) -> str:
     """
     Take plain text from the website and return Jarvis reply as text.
-    We pass an empty history because the site doesn't need chat memory yet.
+    The site gets its own conversation session for GPT follow-ups.
     """
     try:
-        reply = main.handle(text, [])
+        reply = main.handle_command(text, session="web")
         return reply
     except Exception as e:
         print("jarvis_logic error:", e)
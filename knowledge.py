@@ -5,11 +5,14 @@
 import os
 import json
 import re
+import threading
 
 import numpy as np
 from PyPDF2 import PdfReader
 from sentence_transformers import SentenceTransformer
 
+import llm
+
 # Folder containing your study material
 DOCS_DIR = "knowledge_docs"
 INDEX_FILE = "knowledge_index.json"
@@ -17,17 +20,21 @@ INDEX_FILE = "knowledge_index.json"
 # Sentence-transformers model (offline, no API)
 MODEL_NAME = "all-MiniLM-L6-v2"
 _model = None
+# semantic_cache / memory_index warm-ups and request threads can all ask at once
+_model_lock = threading.Lock()
 
 
 def _get_model():
     """
-    Lazy-load the sentence-transformers model once.
+    Lazy-load the sentence-transformers model once (thread-safe).
     """
     global _model
     if _model is None:
-        print(f"[KB] Loading local embedding model: {MODEL_NAME}")
-        _model = SentenceTransformer(MODEL_NAME)
-        print("[KB] Model loaded.")
+        with _model_lock:
+            if _model is None:
+                print(f"[KB] Loading local embedding model: {MODEL_NAME}")
+                _model = SentenceTransformer(MODEL_NAME)
+                print("[KB] Model loaded.")
     return _model
 
 
@@ -109,10 +116,10 @@ def _cosine_similarity(a, b):
     return dot / (na * nb)
 
 
-def rebuild_knowledge_base(openai_client=None):
+def rebuild_knowledge_base():
     """
     Re-scan all docs in knowledge_docs/ and rebuild vector index.
-    OFFLINE: uses local sentence-transformers model; ignores openai_client.
+    OFFLINE: uses local sentence-transformers model.
     """
     files = _list_documents()
     if not files:
@@ -185,10 +192,11 @@ def _load_index():
         return None
 
 
-def answer_from_knowledge(question: str, openai_client=None):
+def answer_from_knowledge(question: str):
     """
-    Use the prebuilt index + GPT (from main.py) to answer from personal notes.
-    OFFLINE embeddings for retrieval, GPT for generation is still done in main.py.
+    Use the prebuilt index + llm.py to answer from personal notes.
+    OFFLINE embeddings for retrieval; generation uses OpenAI or the local
+    model, whichever llm.py routes to.
     """
     entries = _load_index()
     if not entries:
@@ -241,25 +249,21 @@ def answer_from_knowledge(question: str, openai_client=None):
 
     user_prompt = f"CONTEXT:\n{context}\n\nQUESTION: {question}"
 
-    if openai_client is None:
+    if not llm.available():
         # Fallback: no GPT available, just return the top snippets.
         return (
             "Here is what your notes say, sir (shortened because my GPT brain is offline):\n\n"
             + context
         )
 
-    # Use GPT via the provided client (same as before)
     try:
-        resp = openai_client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
+        return llm.generate(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
             max_tokens=300,
         )
-        ans = resp.choices[0].message.content.strip()
-        return ans
     except Exception as e:
         print("[KB] GPT error:", e)
         return (
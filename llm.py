@@ -0,0 +1,227 @@
+# llm.py
+# Text generation backends for the GPT brain (chat fallback, study plans,
+# knowledge-base answers).
+#
+# Backends (same shape as tts_backends.BACKENDS):
+#   openai - gpt-4.1-mini over the network
+#   local  - llama.cpp GGUF model on the CPU (pip install llama-cpp-python),
+#            loaded once and kept resident
+#
+# Routing (JARVIS_LLM_BACKEND=auto):
+#   - short prompts go local-first when the model is loaded (no network
+#     round trip), everything else OpenAI-first
+#   - a backend whose typical latency does not fit the caller's deadline is
+#     tried last
+#   - a backend that fails is skipped for FAILURE_COOLDOWN_SEC; while every
+#     configured backend is cooling down, generate() raises LLMUnavailable
+#     (available() still reports True - the backend is down, not missing)
+# generate() streams tokens to on_token() when given one.
+
+import os
+import time
+import threading
+
+try:
+    from llama_cpp import Llama
+except ImportError:
+    Llama = None
+
+BACKEND = os.getenv("JARVIS_LLM_BACKEND", "auto")  # auto | openai | local
+OPENAI_MODEL = "gpt-4.1-mini"
+LOCAL_MODEL_PATH = os.getenv("JARVIS_LLM_MODEL", "models/qwen2.5-1.5b-instruct-q4_k_m.gguf")
+LOCAL_CONTEXT = int(os.getenv("JARVIS_LLM_CTX", "4096"))
+LOCAL_THREADS = int(os.getenv("JARVIS_LLM_THREADS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Prompts up to this many (estimated) tokens prefer the local model
+LOCAL_FIRST_MAX_TOKENS = 80
+FAILURE_COOLDOWN_SEC = 60
+LATENCY_SMOOTHING = 0.3  # weight of the newest sample in the moving average
+
+
+class LLMUnavailable(Exception):
+    """No backend could produce an answer."""
+
+
+_lock = threading.Lock()
+_openai_client = None
+_local_model = None
+_local_lock = threading.Lock()  # llama.cpp contexts are not thread-safe
+_loading = threading.Lock()
+_down_until = {}  # backend -> time it may be tried again
+_last = threading.local()  # backend that answered this thread's last generate()
+_latency = {}  # backend -> moving average seconds per call
+
+
+def _estimate_tokens(messages) -> int:
+    return sum(len(m.get("content") or "") for m in messages) // 4
+
+
+# ================== OPENAI ==================
+def configure(openai_client=None):
+    """Hand over the OpenAI client main.py created (None = no key)."""
+    global _openai_client
+    _openai_client = openai_client
+
+
+def _openai_available() -> bool:
+    return _openai_client is not None
+
+
+def _openai_generate(messages, max_tokens, on_token):
+    if on_token is None:
+        resp = _openai_client.chat.completions.create(
+            model=OPENAI_MODEL, messages=messages, max_tokens=max_tokens
+        )
+        return resp.choices[0].message.content.strip()
+
+    parts = []
+    stream = _openai_client.chat.completions.create(
+        model=OPENAI_MODEL, messages=messages, max_tokens=max_tokens, stream=True
+    )
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            on_token(delta)
+    return "".join(parts).strip()
+
+
+# ================== LOCAL (llama.cpp) ==================
+def _local_available() -> bool:
+    return Llama is not None and os.path.exists(LOCAL_MODEL_PATH)
+
+
+def _get_local_model():
+    global _local_model
+    if _local_model is None:
+        with _loading:
+            if _local_model is None:
+                print(f"[LLM] Loading local model: {LOCAL_MODEL_PATH}")
+                start = time.time()
+                _local_model = Llama(
+                    model_path=LOCAL_MODEL_PATH,
+                    n_ctx=LOCAL_CONTEXT,
+                    n_threads=LOCAL_THREADS,
+                    verbose=False,
+                )
+                print(f"[LLM] Local model ready in {time.time() - start:.1f}s")
+    return _local_model
+
+
+def _local_generate(messages, max_tokens, on_token):
+    model = _get_local_model()
+    with _local_lock:
+        if on_token is None:
+            resp = model.create_chat_completion(messages=messages, max_tokens=max_tokens)
+            return resp["choices"][0]["message"]["content"].strip()
+
+        parts = []
+        for chunk in model.create_chat_completion(messages=messages, max_tokens=max_tokens, stream=True):
+            delta = chunk["choices"][0]["delta"].get("content")
+            if delta:
+                parts.append(delta)
+                on_token(delta)
+        return "".join(parts).strip()
+
+
+def warm_up():
+    """Load the local model now so the first local answer is not slow."""
+    if _local_available():
+        try:
+            _get_local_model()
+        except Exception as e:
+            print("[LLM] Local model failed to load:", e)
+            _down_until["local"] = float("inf")
+
+
+def warm_up_async():
+    threading.Thread(target=warm_up, daemon=True, name="jarvis-llm-warmup").start()
+
+
+BACKENDS = {
+    "openai": {"available": _openai_available, "generate": _openai_generate},
+    "local": {"available": _local_available, "generate": _local_generate},
+}
+
+
+# ================== ROUTING ==================
+def _configured() -> list:
+    names = [BACKEND] if BACKEND in BACKENDS else ["openai", "local"]
+    return [n for n in names if BACKENDS[n]["available"]()]
+
+
+def _candidates(messages, max_tokens, deadline):
+    now = time.time()
+    names = [n for n in _configured() if _down_until.get(n, 0) <= now]
+
+    if BACKEND == "auto" and "local" in names and _local_model is not None:
+        if _estimate_tokens(messages) <= LOCAL_FIRST_MAX_TOKENS and max_tokens <= 200:
+            names.sort(key=lambda n: n != "local")
+
+    if deadline is not None:
+        # Backends known to be too slow for this caller go last
+        names.sort(key=lambda n: _latency.get(n, 0) > deadline)
+    return names
+
+
+def available() -> bool:
+    """True if any backend is configured (it may still be temporarily down)."""
+    return bool(_configured())
+
+
+def generate(messages, max_tokens: int = 200, deadline: float = None, on_token=None) -> str:
+    """
+    Answer a chat-style messages list with the best available backend.
+    Raises LLMUnavailable if none is configured or all of them failed.
+    """
+    names = _candidates(messages, max_tokens, deadline)
+    if not names:
+        if _configured():
+            raise LLMUnavailable("all generation backends are cooling down after failures")
+        raise LLMUnavailable("no generation backend configured")
+
+    last_error = None
+    for name in names:
+        start = time.time()
+        streamed = []
+
+        def relay(token, _streamed=streamed):
+            _streamed.append(token)
+            on_token(token)
+
+        try:
+            text = BACKENDS[name]["generate"](messages, max_tokens, relay if on_token else None)
+        except Exception as e:
+            print(f"[LLM] {name} failed:", e)
+            last_error = e
+            with _lock:
+                _down_until[name] = time.time() + FAILURE_COOLDOWN_SEC
+            if streamed:
+                break  # caller already saw partial output; do not restart it
+            continue
+
+        elapsed = time.time() - start
+        with _lock:
+            prev = _latency.get(name)
+            _latency[name] = elapsed if prev is None else prev + LATENCY_SMOOTHING * (elapsed - prev)
+        print(f"[LLM] {name} answered in {elapsed:.2f}s")
+        _last.backend = name
+        return text
+
+    raise LLMUnavailable(str(last_error))
+
+
+def last_backend():
+    """Backend that answered the calling thread's last generate(), or None."""
+    return getattr(_last, "backend", None)
+
+
+def stats() -> dict:
+    now = time.time()
+    return {
+        name: {
+            "available": BACKENDS[name]["available"](),
+            "down": _down_until.get(name, 0) > now,
+            "avg_latency_sec": round(_latency[name], 2) if name in _latency else None,
+        }
+        for name in BACKENDS
+    }
@@ -6,18 +6,33 @@ import urllib.parse
 import re
 import webbrowser
 import time
-from threading import Thread
+from threading import Thread, Event, Lock
 from typing import Tuple  # <-- NEW
 
-import requests
 import wikipedia
-import psutil
-import speech_recognition as sr
 from dotenv import load_dotenv
 from openai import OpenAI
 
 import vision  # your vision utilities (register_face, recognize_face, etc.)
 import knowledge  # Personal Knowledge Base (RAG over notes/PDFs)
+import speech  # queued, non-blocking voice output
+import tts_cache  # pre-rendered audio for recurring phrases
+import stt  # speech-to-text backends (google / offline vosk)
+import vad  # end-of-speech detection + latency stats
+import dispatcher  # slow skills on a bounded pool with deadlines
+import events  # push channel to the HUD (/events)
+import telemetry  # sampled CPU / RAM / battery / temperature
+import cache  # TTL response cache for weather / news / cricket / wiki / search
+import http_client  # pooled outbound HTTP with retries + latency metrics
+import prefetch  # ready-made weather / news briefings
+import cricket  # live cricket tracker with wicket / result announcements
+import media  # play-command resolver (music library + local video index)
+import app_index  # installed apps for "open ..." (fuzzy lookup)
+import conversation  # per-session GPT history (summarized, token-budgeted)
+import llm  # generation backends (OpenAI / local llama.cpp)
+import semantic_cache  # reuse answers to paraphrased GPT questions
+import memory_index  # semantic recall over notes / reminders / plans
+import user_profile  # name + favourites (normalized, fuzzy keys)
 
 # ================== SETUP ==================
 load_dotenv()
@@ -30,7 +45,6 @@ DEFAULT_WEATHER_CITY = os.getenv("WEATHER_CITY", "Delhi")
 CRICKET_API_KEY = os.getenv("CRICKET_API_KEY")  # live cricket API key
 
 client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-recognizer = sr.Recognizer()
 
 MEMORY_FILE = "memory.json"
 WAKE_WORD = "jarvis"
@@ -40,11 +54,13 @@ VOICE = "Daniel"  # macOS voice name
 
 
 # ================== BASIC UTILITIES ==================
-def speak(text: str):
+def speak(text: str, priority: int = speech.PRIORITY_REPLY):
     """
     Mac voice mode:
     - All Jarvis speech comes from your Mac using macOS 'say'
-    - Called from CLI, Flask /ask, Flask /speak
+      (espeak or a file sink on Linux, see speech.py)
+    - Called from CLI, Flask /ask, Flask /speak, reminder + intruder watchers
+    - Returns immediately; the speech worker plays messages one at a time
     """
     if not text:
         return
@@ -52,29 +68,40 @@ def speak(text: str):
     print(f"[JARVIS SPEAK] {text}")  # debug
 
     try:
-        # Use absolute path to 'say' to avoid PATH issues
-        subprocess.run(
-            ["/usr/bin/say", "-v", VOICE, text],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        speech.say(text, priority=priority, voice=VOICE)
     except Exception as e:
         print("[JARVIS SPEAK ERROR]", e)
 
 
-def listen(timeout=6, phrase_time_limit=8) -> str:
-    """Microphone listening (only for CLI main loop)."""
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.4)
-        print("Listening...")
-        try:
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-            query = recognizer.recognize_google(audio, language="en-IN")
-            print(f"You: {query}")
-            return query.lower()
-        except Exception as e:
-            print("Listen error:", e)
-            return ""
+STOP_WORDS = ("stop talking", "stop speaking", "be quiet", "shut up")
+# Whole commands that end the CLI loop ("shutdown system" is a skill, not this)
+EXIT_COMMANDS = ("exit", "quit", "shutdown", "shut down")
+# Keep listening while Jarvis talks so "stop talking" cuts it off. Off by
+# default: without echo cancellation the mic also hears the speaker.
+BARGE_IN = os.getenv("JARVIS_BARGE_IN", "0") == "1"
+
+# How often status changes are pushed to the HUD over /events
+STATUS_TICK_SEC = 1.0
+
+
+def _route_partial(partial: str):
+    """
+    Early intent routing on partial transcripts (streaming STT only).
+    'stop talking' cuts Jarvis off while the user is still speaking.
+    """
+    if any(w in partial for w in STOP_WORDS) and speech.is_speaking():
+        speech.cancel_all()
+
+
+def listen(timeout=6, phrase_time_limit=15) -> str:
+    """
+    Microphone listening (only for CLI main loop).
+    Stops as soon as the VAD hears trailing silence; phrase_time_limit is a cap.
+    """
+    query = stt.listen(timeout=timeout, phrase_time_limit=phrase_time_limit, on_partial=_route_partial)
+    if query:
+        print(f"You: {query}")
+    return query
 
 
 # ================== MEMORY ==================
@@ -113,12 +140,19 @@ def load_memory():
         }
 
 
+_memory_lock = Lock()  # request threads + watchers may save at the same time
+
+
 def save_memory(mem):
     try:
-        with open(MEMORY_FILE, "w") as f:
-            json.dump(mem, f, indent=2)
+        with _memory_lock:
+            tmp_path = MEMORY_FILE + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(mem, f, indent=2)
+            os.replace(tmp_path, MEMORY_FILE)
     except Exception as e:
         print("Memory save error:", e)
+    memory_index.sync(mem)
 
 
 memory = load_memory()
@@ -130,94 +164,123 @@ def update_profile_from_sentence(cmd: str):
     - my name is raj
     - my favourite game is gta 5
     """
-    text = cmd.lower()
+    reply = user_profile.learn(cmd.lower(), memory)
+    if reply:
+        save_memory(memory)
+    return reply
 
-    # Name
-    if "my name is" in text:
-        name = text.split("my name is", 1)[1].strip()
-        if name:
-            memory["profile"]["name"] = name
-            save_memory(memory)
-            return f"Nice to meet you, {name}."
-
-    # Favourites
-    if "my favourite" in text or "my favorite" in text:
-        key = "favourite" if "favourite" in text else "favorite"
-        rest = text.split(key, 1)[1].strip()
-        if " is " in rest:
-            attr, value = rest.split(" is ", 1)
-            attr = attr.strip()
-            value = value.strip()
-            if attr and value:
-                memory["favorites"][attr] = value
-                save_memory(memory)
-                return f"I will remember your favourite {attr} is {value}."
 
-    return None
+def answer_profile_query(cmd: str):
+    return user_profile.answer(cmd.lower(), memory)
+
+
+# "what did I tell you about my exam" -> top matches from memory_index
+RECALL_RE = re.compile(
+    r"(?:what did i (?:tell|say to) you|what do you remember|do you remember anything|"
+    r"what have i told you) about (.+)"
+)
+RECALL_TOP_K = 3
+RECALL_RECENT_NOTES = 5
+# "about my exam" is read back as "about your exam"
+SECOND_PERSON = {"i": "you", "me": "you", "my": "your", "mine": "yours", "myself": "yourself", "i'm": "you're"}
+
+
+def _second_person(text: str) -> str:
+    return " ".join(SECOND_PERSON.get(w, w) for w in text.split())
+
+
+def recall_memory(topic: str) -> str:
+    topic = topic.strip(" ?.")
+    hits = memory_index.search(topic, k=RECALL_TOP_K)
+    topic = _second_person(topic)
+    if not hits:
+        return f"I don't remember anything about {topic}, sir."
+    parts = []
+    for hit in hits:
+        if hit["kind"] == "note":
+            parts.append(f"you told me {_second_person(hit['text'])}")
+        elif hit["kind"] == "reminder":
+            parts.append(f"you have a reminder to {_second_person(hit['text'])}")
+        else:
+            parts.append(f"you have a study plan for {hit['label']}")
+    return "About " + topic + ": " + "; ".join(parts) + "."
 
 
-def answer_profile_query(cmd: str):
-    text = cmd.lower()
-    prof = memory.get("profile", {})
-    favs = memory.get("favorites", {})
-
-    if "what is my name" in text:
-        name = prof.get("name")
-        return f"Your name is {name}." if name else "You have not told me your name yet."
-
-    if "what is my favourite" in text or "what is my favorite" in text:
-        key = text.replace("what is my favourite", "").replace("what is my favorite", "")
-        key = key.replace("?", "").strip()
-        if not key:
-            return "Which favourite are you asking about, sir?"
-        value = favs.get(key)
-        if value:
-            return f"Your favourite {key} is {value}."
-        return "You did not tell me that yet."
-
-    if "what do you know about me" in text:
-        bits = []
-        if prof.get("name"):
-            bits.append(f"your name is {prof['name']}")
-        for k, v in favs.items():
-            bits.append(f"your favourite {k} is {v}")
-        notes = memory.get("notes", [])
-        if notes:
-            bits.append("you told me: " + "; ".join(notes[:3]))
-        if not bits:
-            return "I do not know much yet, sir."
-        return "Here is what I know about you: " + "; ".join(bits)
+# ================== GPT BRAIN ==================
+# Generation goes through llm.py: OpenAI when reachable, local GGUF model
+# otherwise (or first, for short prompts once it is loaded).
+llm.configure(client)
 
-    return None
+GPT_NO_KEY_REPLY = "My OpenAI key is not configured, and no local model is installed."
+GPT_ERROR_REPLY = "Sorry, I am having trouble thinking right now."
 
 
-# ================== GPT BRAIN ==================
-def ask_gpt(prompt: str, history):
-    if not client:
-        return "My OpenAI key is not configured."
+def ask_gpt(prompt: str, history, on_token=None):
+    if not llm.available():
+        return GPT_NO_KEY_REPLY
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=history + [{"role": "user", "content": prompt}],
+        return llm.generate(
+            history + [{"role": "user", "content": prompt}],
             max_tokens=200,
+            deadline=dispatcher.SKILL_DEADLINES["gpt"],
+            on_token=on_token,
         )
-        return resp.choices[0].message.content.strip()
-    except Exception as e:
+    except llm.LLMUnavailable as e:
         print("GPT error:", e)
-        return "Sorry, I am having trouble thinking right now."
+        return GPT_ERROR_REPLY
+
+
+def chat_with_context(prompt: str, session: str = None) -> str:
+    """GPT fallback with this session's conversation history."""
+
+    # Stream tokens to the HUD tab that asked (see "reply_delta" in app.js)
+    def on_token(token):
+        events.publish("reply_delta", {"client": session, "text": token})
+
+    history = conversation.history(session)
+    has_context = len(history) > 1  # anything beyond the system prompt
+
+    reply = semantic_cache.lookup(prompt, has_context)
+    if reply:
+        conversation.record(session, prompt, reply)
+        return reply
+
+    reply = ask_gpt(prompt, history, on_token=on_token)
+    if reply not in (GPT_NO_KEY_REPLY, GPT_ERROR_REPLY):
+        conversation.record(session, prompt, reply)
+        semantic_cache.store(prompt, reply, has_context, backend=llm.last_backend())
+    return reply
+
+
+def summarize_turns(previous: str, turns) -> str:
+    """Summarizer for conversation.py: fold old turns into a short summary."""
+    if not llm.available():
+        return None
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    return llm.generate(
+        [
+            {
+                "role": "system",
+                "content": "Summarize this conversation for later context in at most 5 short lines. "
+                "Keep names, facts, numbers and open questions.",
+            },
+            {"role": "user", "content": f"Earlier summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"},
+        ],
+        max_tokens=150,
+    )
+
+
+conversation.set_summarizer(summarize_turns)
 
 
 # ================== INTERNET SKILLS ==================
 def play_youtube(query: str) -> str:
     search_url = "https://www.youtube.com/results?search_query=" + urllib.parse.quote(query)
     try:
-        res = requests.get(search_url, timeout=5)
-        video_ids = re.findall(r"watch\?v=([\w-]{11})", res.text)
-        if video_ids:
-            url = "https://www.youtube.com/watch?v=" + video_ids[0]
-        else:
-            url = search_url
-        webbrowser.open(url)
+        # musicLibrary -> local query index -> network search (see media.py)
+        url, source = media.resolve(query)
+        print(f"[MEDIA] {query!r} -> {url} ({source})")
+        webbrowser.open(url or search_url)
         return f"Playing {query} on YouTube."
     except Exception as e:
         print("YouTube error:", e)
@@ -225,41 +288,80 @@ def play_youtube(query: str) -> str:
         return f"There was an issue, but I opened YouTube search for {query}."
 
 
+def fetch_weather(city: str):
+    """Current weather for city as {"temp", "desc"}, or None if the API refused."""
+    url = f"http://api.openweathermap.org/data/2.5/weather?q={urllib.parse.quote(city)}&appid={WEATHER_API_KEY}&units=metric"
+    data = http_client.get_json(url)
+    if data.get("cod") != 200:
+        return None
+    return {"temp": int(data["main"]["temp"]), "desc": data["weather"][0]["description"]}
+
+
+def format_weather(city: str, weather: dict) -> str:
+    return f"The weather in {city} is {weather['desc']}, {weather['temp']}°C."
+
+
+def weather_briefing():
+    """Prefetch job: briefing for the default city (None on failure)."""
+    weather = fetch_weather(DEFAULT_WEATHER_CITY)
+    return format_weather(DEFAULT_WEATHER_CITY, weather) if weather else None
+
+
 def get_weather(cmd: str) -> str:
     if not WEATHER_API_KEY:
         return "Weather API key is not configured."
     city = DEFAULT_WEATHER_CITY
     if " in " in cmd:
         city = cmd.split(" in ", 1)[1].strip()
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={urllib.parse.quote(city)}&appid={WEATHER_API_KEY}&units=metric"
+    if cache.normalize(city) == cache.normalize(DEFAULT_WEATHER_CITY):
+        ready = prefetch.get("weather")
+        if ready:
+            return ready
     try:
-        data = requests.get(url, timeout=5).json()
-        if data.get("cod") != 200:
-            return f"Weather error for {city}."
-        temp = int(data["main"]["temp"])
-        desc = data["weather"][0]["description"]
-        return f"The weather in {city} is {desc}, {temp}°C."
+        weather = cache.cached("weather", city, lambda: fetch_weather(city))
     except Exception as e:
         print("Weather error:", e)
         return "Sorry, I could not fetch the weather."
+    if weather is None:
+        return f"Weather error for {city}."
+    return format_weather(city, weather)
+
+
+def fetch_headlines():
+    """Top headline titles, or None if there are none."""
+    url = f"https://newsapi.org/v2/top-headlines?country={NEWS_COUNTRY}&apiKey={NEWS_API_KEY}"
+    data = http_client.get_json(url)
+    arts = data.get("articles", [])[:5]
+    heads = [a.get("title") for a in arts if a.get("title")]
+    return heads or None
+
+
+def format_headlines(heads) -> str:
+    return "Here are top headlines. " + " ".join(
+        [f"Headline {i+1}: {h}." for i, h in enumerate(heads)]
+    )
+
+
+def news_briefing():
+    """Prefetch job: spoken headline briefing (None on failure)."""
+    heads = fetch_headlines()
+    return format_headlines(heads) if heads else None
 
 
 def get_news() -> str:
     if not NEWS_API_KEY:
         return "News API key is not configured."
+    ready = prefetch.get("news")
+    if ready:
+        return ready
     try:
-        url = f"https://newsapi.org/v2/top-headlines?country={NEWS_COUNTRY}&apiKey={NEWS_API_KEY}"
-        data = requests.get(url, timeout=5).json()
-        arts = data.get("articles", [])[:5]
-        if not arts:
-            return "No news articles found."
-        heads = [a.get("title") for a in arts if a.get("title")]
-        return "Here are top headlines. " + " ".join(
-            [f"Headline {i+1}: {h}." for i, h in enumerate(heads)]
-        )
+        heads = cache.cached("news", NEWS_COUNTRY, fetch_headlines)
     except Exception as e:
         print("News error:", e)
         return "Sorry, I could not fetch the news."
+    if not heads:
+        return "No news articles found."
+    return format_headlines(heads)
 
 
 def wiki(cmd: str) -> str:
@@ -272,39 +374,39 @@ def wiki(cmd: str) -> str:
     if not topic:
         return "Please tell me what to search for."
     try:
-        return wikipedia.summary(topic, sentences=2)
+        return cache.cached("wiki", topic, lambda: wikipedia.summary(topic, sentences=2))
     except Exception as e:
         print("Wiki error:", e)
         return "I could not find information on that."
 
 
 # ================== WEB SEARCH (DUCKDUCKGO) ==================
+def fetch_search_titles(query: str):
+    """Top 3 DuckDuckGo result titles, or None if the page had none."""
+    url_html = "https://duckduckgo.com/html/?q=" + urllib.parse.quote(query)
+    headers = {"User-Agent": "Mozilla/5.0"}
+    html = http_client.get(url_html, headers=headers).text
+
+    # Grab top result titles from result__a anchors
+    matches = re.findall(r'class="result__a".*?>(.*?)</a>', html)
+    # Strip HTML tags
+    titles = [re.sub("<.*?>", "", m) for m in matches[:3]]
+    return titles or None
+
+
 def web_search_ddg(query: str) -> str:
     """
     Simple real-time web search using DuckDuckGo.
     - Opens full results in browser
     - Tries to read top 2–3 result titles and speak them
     """
-    url_html = "https://duckduckgo.com/html/?q=" + urllib.parse.quote(query)
     url_main = "https://duckduckgo.com/?q=" + urllib.parse.quote(query)
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(url_html, timeout=5, headers=headers)
-        html = res.text
-
-        # Grab top result titles from result__a anchors
-        matches = re.findall(r'class="result__a".*?>(.*?)</a>', html)
-        if not matches:
-            webbrowser.open(url_main)
+        titles = cache.cached("web_search", query, lambda: fetch_search_titles(query))
+        webbrowser.open(url_main)
+        if not titles:
             return f"I opened web results for {query} in your browser, sir."
-
-        # Strip HTML tags
-        def strip_tags(t):
-            return re.sub("<.*?>", "", t)
-
-        titles = [strip_tags(m) for m in matches[:3]]
         summary = " ; ".join(titles)
-        webbrowser.open(url_main)
         return f"Here is what I found about {query}: {summary}."
     except Exception as e:
         print("Web search error:", e)
@@ -315,111 +417,32 @@ def web_search_ddg(query: str) -> str:
 # ================== LIVE CRICKET (CRICKETDATA) ==================
 def get_live_cricket_score(cmd: str) -> str:
     """
-    Uses CricketData currentMatches API to get live scores.
+    Live score from the background cricket tracker (see cricket.py).
     You must set CRICKET_API_KEY in .env.
     """
     if not CRICKET_API_KEY:
         return "Live cricket API key is not configured in my system, sir."
-
-    try:
-        url = f"https://api.cricapi.com/v1/currentMatches?apikey={CRICKET_API_KEY}&offset=0"
-        resp = requests.get(url, timeout=8)
-        data = resp.json()
-        print("DEBUG Cricket response:", data)
-
-        # Different APIs might use different keys; try to be defensive.
-        matches = data.get("data") or data.get("matches") or []
-        if not matches:
-            return "I did not find any ongoing match right now, sir."
-
-        cmd_lower = cmd.lower()
-        target = None
-
-        # Try to prioritise India match if user mentions India
-        if "india" in cmd_lower:
-            for m in matches:
-                name = (m.get("name") or m.get("match") or "").lower()
-                teams = (m.get("teams") or m.get("team") or [])
-                teams_text = " ".join(teams).lower() if isinstance(teams, list) else str(teams).lower()
-                if "india" in name or "india" in teams_text:
-                    target = m
-                    break
-
-        # Fallback: just take the first match
-        if target is None:
-            target = matches[0]
-
-        name = target.get("name") or target.get("match") or "A cricket match"
-        status = target.get("status") or target.get("matchStatus") or target.get("match_status") or ""
-
-        # Score may be a list or single dict or nested under a key
-        raw_score = target.get("score") or target.get("scorecard") or target.get("score_full") or []
-
-        innings_list = []
-        if isinstance(raw_score, list):
-            innings_list = raw_score
-        elif isinstance(raw_score, dict):
-            innings_list = [raw_score]
-
-        parts = []
-        for inn in innings_list:
-            r = inn.get("r") or inn.get("runs") or "?"
-            w = inn.get("w") or inn.get("wickets") or "?"
-            o = inn.get("o") or inn.get("overs") or "?"
-            inn_name = inn.get("inning") or inn.get("inningName") or inn.get("team") or ""
-            if inn_name:
-                parts.append(f"{inn_name}: {r}/{w} in {o} overs")
-            else:
-                parts.append(f"{r}/{w} in {o} overs")
-
-        score_text = " | ".join(parts) if parts else "Score details are not available yet, sir."
-
-        if status:
-            return f"{name}. {score_text}. Status: {status}."
-        else:
-            return f"{name}. {score_text}."
-    except Exception as e:
-        print("Cricket live error:", e)
-        return "I tried to fetch the live cricket score, but something went wrong, sir."
+    return cricket.score_for(cmd, CRICKET_API_KEY)
 
 
 # ================== SYSTEM INTELLIGENCE ==================
 def get_cpu_temperature():
     """
-    Uses 'osx-cpu-temp' (installed via Homebrew) to read CPU temperature.
-    Returns a string like '46.5°C' or None if it fails.
+    Latest sampled CPU temperature (see telemetry.py).
+    Returns a string like '46.5°C' or None if sensors are unavailable.
     """
-    try:
-        temp = subprocess.check_output(["osx-cpu-temp"]).decode().strip()
-        return temp
-    except Exception as e:
-        print("CPU temp error:", e)
-        return None
+    temp = telemetry.latest().get("temp")
+    return f"{temp:.1f}°C" if temp is not None else None
 
 
 def system_report() -> str:
     """
     Combines CPU, RAM, battery, and temperature into a spoken-style status.
     """
-    try:
-        cpu = psutil.cpu_percent()
-    except Exception as e:
-        print("CPU percent error:", e)
-        cpu = None
-
-    try:
-        ram = psutil.virtual_memory().percent
-    except Exception as e:
-        print("RAM percent error:", e)
-        ram = None
-
-    try:
-        bat = psutil.sensors_battery()
-        bat_str = f"{bat.percent}%" if bat else "N/A"
-    except Exception as e:
-        print("Battery read error:", e)
-        bat_str = "N/A"
-
+    snap = telemetry.latest()
+    cpu = snap.get("cpu")
+    ram = snap.get("ram")
+    bat_str = f"{snap['battery']}%" if snap.get("battery") is not None else "N/A"
     temp = get_cpu_temperature()
 
     parts = ["System diagnostics:"]
@@ -455,13 +478,40 @@ def clean_system() -> str:
 
 
 # ================== APP / SYSTEM CONTROL ==================
+# Friendly names for websites ("open gmail" is the site, not Mail.app)
+SITE_ALIASES = {
+    "youtube": "youtube.com",
+    "yt": "youtube.com",
+    "facebook": "facebook.com",
+    "fb": "facebook.com",
+    "linkedin": "linkedin.com",
+    "insta": "instagram.com",
+    "instagram": "instagram.com",
+    "x": "x.com",
+    "twitter": "twitter.com",
+    "gmail": "mail.google.com",
+    "google": "google.com",
+}
+
+
+def _launch_app(app: dict) -> bool:
+    try:
+        subprocess.Popen(app["launch"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return True
+    except Exception as e:
+        print("App launch error:", e)
+        return False
+
+
 def launch_any_app(app_name: str) -> str:
     """
-    Launch macOS apps by voice.
-    - First tries to open a real .app
-    - If that fails, falls back to opening a website in the browser
-      (facebook, linkedin, youtube, etc.).
-    Special hard-coded case for Canva.
+    Launch apps by voice.
+    - An installed app with exactly that name wins
+    - Known website names (SITE_ALIASES) and spoken domains
+      ("facebook dot com") open in the browser
+    - Otherwise the installed-app index is searched fuzzily, so misheard
+      names like "vs cold" still work (see app_index.py)
+    - Anything left is treated as a website
     """
     raw = app_name.strip()
     if not raw:
@@ -469,66 +519,23 @@ def launch_any_app(app_name: str) -> str:
 
     lower = raw.lower()
 
-    # ===== Special case: Canva desktop app =====
-    if "canva" in lower:
-        try:
-            subprocess.run(["open", "/Applications/Canva.app"])
-            return "Launching Canva."
-        except Exception as e:
-            print("Canva open error:", e)
-            return "I tried, but could not open Canva."
-
-    # ===== Spoken-name → real app mapping =====
-    mapping = {
-        "chrome": "Google Chrome",
-        "google chrome": "Google Chrome",
-        "vs code": "Visual Studio Code",
-        "visual studio code": "Visual Studio Code",
-        "settings": "System Settings",
-        "system settings": "System Settings",
-        "finder": "Finder",
-        "music": "Music",
-        "itunes": "Music",
-        "messages": "Messages",
-        "photos": "Photos",
-        "whatsapp": "WhatsApp",
-        "spotify": "Spotify",
-        "safari": "Safari",
-        "terminal": "Terminal",
-    }
-    app_to_open = mapping.get(lower, raw)
-
-    # ===== 1) Try to open as a native macOS app =====
-    try:
-        result = subprocess.run(
-            ["open", "-a", app_to_open],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        if result.returncode == 0:
-            return f"Launching {app_to_open}."
-    except Exception as e:
-        print("open -a error:", e)
-
-    # ===== 2) Fallback: treat as website and open in browser =====
+    # ===== 1) Installed app, exact name =====
+    app = app_index.lookup(raw, fuzzy=False)
+    if app and _launch_app(app):
+        return f"Launching {app['name']}."
 
     # Normalize spoken website names: "facebook dot com" → "facebook.com"
     site_name = lower.replace(" dot ", ".").replace(" ", "")
-    # Some friendly aliases
-    site_aliases = {
-        "youtube": "youtube.com",
-        "yt": "youtube.com",
-        "facebook": "facebook.com",
-        "fb": "facebook.com",
-        "linkedin": "linkedin.com",
-        "insta": "instagram.com",
-        "instagram": "instagram.com",
-        "x": "x.com",
-        "twitter": "twitter.com",
-        "gmail": "mail.google.com",
-        "google": "google.com",
-    }
-    site_name = site_aliases.get(site_name, site_name)
+    is_site = site_name in SITE_ALIASES or "." in site_name
+
+    # ===== 2) Installed app, fuzzy =====
+    if not is_site:
+        app = app_index.lookup(raw)
+        if app and _launch_app(app):
+            return f"Launching {app['name']}."
+
+    # ===== 3) Fallback: treat as website and open in browser =====
+    site_name = SITE_ALIASES.get(site_name, site_name)
 
     # If there is no dot at all, assume .com
     if "." not in site_name:
@@ -592,12 +599,7 @@ def tell_time() -> str:
 def get_status():
     """Used by /status route for time + battery."""
     now = datetime.datetime.now().strftime("%H:%M:%S")
-    try:
-        bat = psutil.sensors_battery()
-        battery = bat.percent if bat else None
-    except Exception:
-        battery = None
-    return {"time": now, "battery": battery}
+    return {"time": now, "battery": telemetry.latest().get("battery")}
 
 
 # ================== SMART HOME (VIRTUAL) ==================
@@ -834,9 +836,10 @@ def reminder_watcher():
     - Daily reminders: rescheduled for next day
     """
     global memory
-    while True:
+    while not _stop_event.is_set():
         try:
-            time.sleep(30)
+            if _stop_event.wait(30):
+                break
             now_ts = time.time()
             rlist = memory.setdefault("reminders", [])
             if not rlist:
@@ -848,7 +851,9 @@ def reminder_watcher():
                     t = float(r.get("time", 0))
                     repeat = r.get("repeat")
                     if now_ts >= t:
-                        speak(f"Reminder, sir: {r.get('text', 'something you asked me to remember.')}")
+                        text = r.get("text", "something you asked me to remember.")
+                        events.publish("reminder", {"text": text, "repeat": repeat})
+                        speak(f"Reminder, sir: {text}", priority=speech.PRIORITY_REMINDER)
                         if repeat == "daily":
                             # Shift forward 1 day (or more if we are very late)
                             next_t = t
@@ -870,6 +875,20 @@ def reminder_watcher():
             print("Reminder watcher loop error:", e)
 
 
+def status_ticker():
+    """Publish status changes (time, battery) to the HUD as small deltas."""
+    last = {}
+    while not _stop_event.wait(STATUS_TICK_SEC):
+        try:
+            current = get_status()
+            delta = {k: v for k, v in current.items() if last.get(k) != v}
+            if delta:
+                events.publish("status", delta)
+                last = current
+        except Exception as e:
+            print("Status ticker error:", e)
+
+
 # ================== SECURITY MODE (AI SECURITY) ==================
 def _get_security_state():
     sec = memory.setdefault("security", {"enabled": False, "last_auth_time": 0, "auth_timeout_sec": 60})
@@ -953,9 +972,10 @@ def intruder_watcher():
     - Only runs checks when security mode is enabled.
     - If it sees a person who is NOT raj, triggers spoken intruder alert.
     """
-    while True:
+    while not _stop_event.is_set():
         try:
-            time.sleep(10)
+            if _stop_event.wait(10):
+                break
             if not is_security_enabled():
                 continue
 
@@ -969,12 +989,40 @@ def intruder_watcher():
                 continue
 
             if not same:
-                speak("Intruder detected, sir. Triggering red alert protocol.")
+                events.publish("security", {"alert": "intruder", "score": float(score)})
+                speak("Intruder detected, sir. Triggering red alert protocol.", priority=speech.PRIORITY_ALERT)
                 # Optional: could log timestamp here
         except Exception as e:
             print("Intruder watcher error:", e)
 
 
+# ================== VISION REPLIES ==================
+def vision_register_reply() -> str:
+    ok = vision.register_face("raj")
+    return "I have registered your face, sir." if ok else "I could not capture your face."
+
+
+def vision_recognize_reply() -> str:
+    same, score = vision.recognize_face("raj")
+    if score is None:
+        return "I have no stored face. Say register my face first."
+    return "Yes sir, I see you." if same else "I see someone, but I'm not sure it's you."
+
+
+def vision_hand_reply() -> str:
+    gesture = vision.detect_hand_gesture()
+    if gesture == "open_palm":
+        return "I see an open palm."
+    elif gesture == "no_hand":
+        return "I do not see any hand."
+    else:
+        return "I see a hand, but I cannot classify the gesture."
+
+
+def vision_person_reply() -> str:
+    return "I can see at least one person." if vision.see_any_person() else "I do not clearly see anyone right now."
+
+
 # ================== STUDY PLANNER (AUTONOMOUS TASK PLANNER) ==================
 def _normalize_topic(text: str) -> str:
     return (text or "").strip().lower()
@@ -996,7 +1044,7 @@ def create_study_plan(topic: str) -> str:
         f"User is a college student with basic programming background."
     )
 
-    if not client:
+    if not llm.available():
         # Fallback plan without GPT
         plan_text = (
             f"Study plan for {topic} (offline template):\n"
@@ -1010,15 +1058,14 @@ def create_study_plan(topic: str) -> str:
         )
     else:
         try:
-            resp = client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
+            plan_text = llm.generate(
+                [
                     {"role": "system", "content": "You are a helpful study planner."},
                     {"role": "user", "content": base_prompt},
                 ],
                 max_tokens=400,
+                deadline=dispatcher.SKILL_DEADLINES["study_plan"],
             )
-            plan_text = resp.choices[0].message.content.strip()
         except Exception as e:
             print("Study planner GPT error:", e)
             plan_text = (
@@ -1135,28 +1182,174 @@ def update_study_progress(cmd: str) -> str:
 
 
 # ================== WATCHERS THREADS START ==================
-try:
-    reminder_thread = Thread(target=reminder_watcher, daemon=True)
-    reminder_thread.start()
-except Exception as e:
-    print("Reminder watcher start error:", e)
+_stop_event = Event()
+_services_lock = Lock()
+_services_started = False
+_service_threads = []
+
+
+def start_background_services():
+    """
+    Start reminder + intruder watchers, the HUD status ticker, the telemetry
+    sampler, briefing prefetch, the cricket tracker, the app index, the
+    memory index and the TTS pre-warm exactly once, no matter how many times main is imported
+    or this is called.
+    """
+    global _services_started
+    with _services_lock:
+        if _services_started:
+            return
+        _services_started = True
+        _stop_event.clear()
+
+        for name, target in (
+            ("reminder", reminder_watcher),
+            ("intruder", intruder_watcher),
+            ("status", status_ticker),
+        ):
+            try:
+                t = Thread(target=target, daemon=True, name=f"jarvis-{name}-watcher")
+                t.start()
+                _service_threads.append(t)
+            except Exception as e:
+                print(f"{name.capitalize()} watcher start error:", e)
+
+        try:
+            telemetry.start()
+        except Exception as e:
+            print("Telemetry start error:", e)
+
+        # Briefings are only served while as fresh as the response cache
+        # allows for that skill (20 min weather / 40 min news), so they
+        # refresh every 5-15 min / 10-30 min, faster the more often asked
+        if WEATHER_API_KEY:
+            prefetch.register("weather", weather_briefing, 5 * 60, 60 * 60,
+                              max_age=sum(cache.SKILL_POLICIES["weather"]))
+        if NEWS_API_KEY:
+            prefetch.register("news", news_briefing, 10 * 60, 120 * 60,
+                              max_age=sum(cache.SKILL_POLICIES["news"]))
+        prefetch.start()
+
+        if CRICKET_API_KEY:
+            cricket.start(CRICKET_API_KEY)
+
+        app_index.start()
+        memory_index.start(memory)
+        llm.warm_up_async()  # keep the local model resident
+        semantic_cache.warm_up_async()
+
+        try:
+            tts_cache.prewarm_async()
+        except Exception as e:
+            print("TTS cache prewarm error:", e)
+
+
+def stop_background_services(timeout: float = 5.0):
+    """Stop watchers, silence speech and flush memory to disk (graceful shutdown)."""
+    global _services_started
+    with _services_lock:
+        _stop_event.set()
+        for t in _service_threads:
+            t.join(timeout=timeout)
+        _service_threads.clear()
+        _services_started = False
+    telemetry.stop(timeout=timeout)
+    prefetch.stop(timeout=timeout)
+    cricket.stop(timeout=timeout)
+    app_index.stop(timeout=timeout)
+    memory_index.stop(timeout=timeout)
+    http_client.close()
+    speech.cancel_all()
+    save_memory(memory)
+    print("Background services stopped, memory saved.")
+
+
+# ================== COMPOSITE COMMANDS (FAN-OUT) ==================
+# "weather, news and my reminders" -> run the independent skills at once
+# and answer in the order they were asked for.
+COMPOSITE_SPLIT_RE = re.compile(r"\s*(?:,|\band then\b|\bthen\b|\band\b|\balso\b|\bplus\b)\s*")
+# Commands that legitimately contain "and" (notes, reminders, searches)
+COMPOSITE_SKIP_PREFIXES = ("remember", "remind", "search", "note", "set ", "add ", "my ")
+BRIEFING_TRIGGERS = ("morning briefing", "daily briefing", "brief me", "good morning")
+
+
+def _composite_intent(part: str):
+    """(skill name, fn, args, label) for one sub-command, or None."""
+    if "weather" in part:
+        return ("weather", get_weather, (part,), "weather")
+    if "news" in part or "headlines" in part:
+        return ("news", get_news, (), "news")
+    if "reminder" in part:
+        return ("reminders", list_reminders, (), "reminders")
+    if "system" in part or "diagnostic" in part:
+        return ("system_report", system_report, (), "system report")
+    if "time" in part:
+        return ("time", tell_time, (), "time")
+    return None
+
 
-try:
-    intruder_thread = Thread(target=intruder_watcher, daemon=True)
-    intruder_thread.start()
-except Exception as e:
-    print("Intruder watcher start error:", e)
+def split_composite(cmd: str):
+    """
+    Sub-intents of a multi-part command, or None unless there are at least
+    two parts and every part is a known independent skill.
+    """
+    if cmd.startswith(COMPOSITE_SKIP_PREFIXES):
+        return None
+    parts = [p for p in COMPOSITE_SPLIT_RE.split(cmd) if p]
+    if len(parts) < 2:
+        return None
+    intents = [_composite_intent(p) for p in parts]
+    if any(i is None for i in intents):
+        return None
+    # "weather and the weather" -> ask once
+    seen = set()
+    unique = []
+    for intent in intents:
+        if intent[0] not in seen:
+            seen.add(intent[0])
+            unique.append(intent)
+    return unique if len(unique) >= 2 else None
+
+
+def run_composite(intents, opening: str = "") -> str:
+    """Run sub-intents concurrently and join their replies in order."""
+    replies = dispatcher.run_skills([(name, fn, args) for name, fn, args, _ in intents])
+    out = [opening] if opening else []
+    for (_, _, _, label), reply in zip(intents, replies):
+        if reply == dispatcher.STILL_WORKING_REPLY:
+            reply = f"The {label} is still loading, I will tell you when it arrives."
+        out.append(reply)
+    return " ".join(out)
+
+
+def morning_briefing() -> str:
+    hour = datetime.datetime.now().hour
+    greeting = "Good morning" if hour < 12 else "Good afternoon" if hour < 17 else "Good evening"
+    intents = [
+        ("time", tell_time, (), "time"),
+        ("weather", get_weather, ("weather",), "weather"),
+        ("news", get_news, (), "news"),
+        ("reminders", list_reminders, (), "reminders"),
+    ]
+    return run_composite(intents, opening=f"{greeting}, sir. Here is your briefing.")
 
 
 # ================== MAIN COMMAND HANDLER ==================
-def handle_command(cmd: str) -> str:
+def handle_command(cmd: str, session: str = None) -> str:
     """
     Main brain used by Flask (/ask) and also CLI mode.
+    session keeps GPT follow-ups separate per client (HUD tab, voice, web).
     """
     global jarvis_sleep, memory
     cmd = (cmd or "").lower().strip()
     print("CMD:", cmd)
 
+    # Stop talking
+    if cmd in ("stop", "quiet") or cmd in STOP_WORDS:
+        speech.cancel_all()
+        dispatcher.cancel_pending()
+        return "Okay, sir."
+
     # Personal learning
     learned = update_profile_from_sentence(cmd)
     if learned:
@@ -1175,9 +1368,19 @@ def handle_command(cmd: str) -> str:
             return "Stored in my memory."
         return "What should I remember, sir?"
 
+    recall = RECALL_RE.search(cmd)
+    if recall:
+        return recall_memory(recall.group(1))
+
     if "what do you remember" in cmd:
         notes = memory.get("notes", [])
-        return "I remember: " + "; ".join(notes) if notes else "I don't have anything stored yet."
+        if not notes:
+            return "I don't have anything stored yet."
+        recent = notes[-RECALL_RECENT_NOTES:]
+        reply = "Most recently you told me: " + "; ".join(reversed(recent))
+        if len(notes) > len(recent):
+            reply += f". I have {len(notes)} notes in total; ask me about a topic to find one."
+        return reply
 
     # ===== KNOWLEDGE BASE COMMANDS (RAG) =====
     if (
@@ -1190,7 +1393,7 @@ def handle_command(cmd: str) -> str:
         or ("reload" in cmd and "knowledge" in cmd)
         or ("reload" in cmd and "note" in cmd)
     ):
-        return knowledge.rebuild_knowledge_base(client)
+        return dispatcher.run_skill("knowledge_reload", knowledge.rebuild_knowledge_base)
 
     if (
         cmd.startswith("search my notes")
@@ -1212,7 +1415,7 @@ def handle_command(cmd: str) -> str:
         q = q.strip()
         if not q:
             q = cmd  # fallback to full command
-        return knowledge.answer_from_knowledge(q, client)
+        return dispatcher.run_skill("knowledge", knowledge.answer_from_knowledge, q)
 
     # Reminders
     if "remind me" in cmd:
@@ -1266,22 +1469,34 @@ def handle_command(cmd: str) -> str:
     if jarvis_sleep:
         return "I am currently in sleep mode. Say Jarvis wake up."
 
+    if "new conversation" in cmd or "forget our conversation" in cmd:
+        conversation.reset(session)
+        return "Okay sir, starting a fresh conversation."
+
+    # Briefing / multi-part commands ("weather, news and my reminders")
+    if any(t in cmd for t in BRIEFING_TRIGGERS):
+        return morning_briefing()
+
+    intents = split_composite(cmd)
+    if intents:
+        return run_composite(intents)
+
     # ===== STUDY PLANNER COMMANDS =====
     if "help me learn" in cmd:
         topic = cmd.split("help me learn", 1)[1].strip()
-        return create_study_plan(topic)
+        return dispatcher.run_skill("study_plan", create_study_plan, topic)
 
     if "create a study plan for" in cmd:
         topic = cmd.split("create a study plan for", 1)[1].strip()
-        return create_study_plan(topic)
+        return dispatcher.run_skill("study_plan", create_study_plan, topic)
 
     if "make a study plan for" in cmd:
         topic = cmd.split("make a study plan for", 1)[1].strip()
-        return create_study_plan(topic)
+        return dispatcher.run_skill("study_plan", create_study_plan, topic)
 
     if "make a learning plan for" in cmd:
         topic = cmd.split("make a learning plan for", 1)[1].strip()
-        return create_study_plan(topic)
+        return dispatcher.run_skill("study_plan", create_study_plan, topic)
 
     if "show my study plans" in cmd or "what are my study plans" in cmd:
         return list_study_plans()
@@ -1298,13 +1513,10 @@ def handle_command(cmd: str) -> str:
         return tell_time()
 
     if "battery" in cmd:
-        try:
-            bat = psutil.sensors_battery()
-            if bat:
-                return f"Battery is {bat.percent}%."
-            return "I cannot read the battery status."
-        except Exception:
-            return "I could not read the battery status."
+        battery = telemetry.latest().get("battery")
+        if battery is not None:
+            return f"Battery is {battery}%."
+        return "I cannot read the battery status."
 
     # ===== LIVE CRICKET COMMANDS =====
     if (
@@ -1314,21 +1526,21 @@ def handle_command(cmd: str) -> str:
         or "today's match" in cmd
         or "todays match" in cmd
     ):
-        return get_live_cricket_score(cmd)
+        return dispatcher.run_skill("cricket", get_live_cricket_score, cmd)
 
     # ===== WEB SEARCH COMMANDS =====
     if cmd.startswith("search "):
         q = cmd.replace("search", "", 1).strip()
         if not q:
             return "What should I search for, sir?"
-        return web_search_ddg(q)
+        return dispatcher.run_skill("web_search", web_search_ddg, q)
 
     if "search" in cmd and not cmd.startswith("search "):
         # e.g. "jarvis can you search tesla model 3 review"
         parts = cmd.split("search", 1)
         q = parts[1].strip()
         if q:
-            return web_search_ddg(q)
+            return dispatcher.run_skill("web_search", web_search_ddg, q)
 
     # ===== SYSTEM INTELLIGENCE COMMANDS =====
     if (
@@ -1340,12 +1552,10 @@ def handle_command(cmd: str) -> str:
         return system_report()
 
     if "cpu usage" in cmd or "cpu status" in cmd:
-        try:
-            cpu = psutil.cpu_percent()
-            return f"Current CPU usage is {cpu} percent, sir."
-        except Exception as e:
-            print("CPU usage error:", e)
+        cpu = telemetry.latest().get("cpu")
+        if cpu is None:
             return "I could not read the CPU usage, sir."
+        return f"Current CPU usage is {cpu} percent, sir."
 
     if "temperature" in cmd or "overheating" in cmd or "too hot" in cmd:
         temp = get_cpu_temperature()
@@ -1408,14 +1618,14 @@ def handle_command(cmd: str) -> str:
 
     # Weather / news
     if "weather" in cmd:
-        return get_weather(cmd)
+        return dispatcher.run_skill("weather", get_weather, cmd)
 
     if "news" in cmd:
-        return get_news()
+        return dispatcher.run_skill("news", get_news)
 
     # YouTube
     if cmd.startswith("play "):
-        return play_youtube(cmd.replace("play", "", 1).strip())
+        return dispatcher.run_skill("youtube", play_youtube, cmd.replace("play", "", 1).strip())
 
     # Open apps / websites
     if cmd.startswith("open "):
@@ -1444,28 +1654,18 @@ def handle_command(cmd: str) -> str:
     if "screenshot" in cmd or "screen shot" in cmd:
         return take_screenshot()
 
-    # Vision
+    # Vision (camera work runs on the skill pool)
     if "register my face" in cmd or "remember my face" in cmd:
-        ok = vision.register_face("raj")
-        return "I have registered your face, sir." if ok else "I could not capture your face."
+        return dispatcher.run_skill("vision", vision_register_reply)
 
     if "do you see me" in cmd or "who is in front of you" in cmd:
-        same, score = vision.recognize_face("raj")
-        if score is None:
-            return "I have no stored face. Say register my face first."
-        return "Yes sir, I see you." if same else "I see someone, but I'm not sure it's you."
+        return dispatcher.run_skill("vision", vision_recognize_reply)
 
     if "check my hand" in cmd or "see my hand" in cmd:
-        gesture = vision.detect_hand_gesture()
-        if gesture == "open_palm":
-            return "I see an open palm."
-        elif gesture == "no_hand":
-            return "I do not see any hand."
-        else:
-            return "I see a hand, but I cannot classify the gesture."
+        return dispatcher.run_skill("vision", vision_hand_reply)
 
     if "do you see anyone" in cmd or "what do you see" in cmd:
-        return "I can see at least one person." if vision.see_any_person() else "I do not clearly see anyone right now."
+        return dispatcher.run_skill("vision", vision_person_reply)
 
     # Small fun personality
     if "roast me" in cmd:
@@ -1476,26 +1676,35 @@ def handle_command(cmd: str) -> str:
 
     # Wikipedia
     if cmd.startswith("who is") or cmd.startswith("what is") or cmd.startswith("tell me about"):
-        return wiki(cmd)
+        return dispatcher.run_skill("wiki", wiki, cmd)
 
-    # GPT fallback
-    history = []  # simple history for now
-    return ask_gpt(cmd, history)
+    # GPT fallback (with this session's conversation history)
+    return dispatcher.run_skill("gpt", chat_with_context, cmd, session)
 
 
 # ================== OPTIONAL CLI LOOP ==================
 def main():
+    start_background_services()
     # Boot voice: Tony-ish
     speak("JARVIS system initializing. Welcome back, sir. You can ask me anything.")
     while True:
+        if not BARGE_IN:
+            # Don't listen while Jarvis is still talking (mic would hear the speaker)
+            speech.wait_idle()
         text = listen()
         if not text:
             continue
         if WAKE_WORD in text:
             text = text.replace(WAKE_WORD, "").strip()
-        if any(x in text for x in ["exit", "stop", "shutdown"]):
+        if any(w in text for w in STOP_WORDS):
+            speech.cancel_all()
+            continue
+        if text.strip(" .!") in EXIT_COMMANDS:
             speak("Shutting down, sir.")
+            speech.wait_idle(timeout=10)
+            stop_background_services()
             break
+        vad.mark_dispatch("cli command")
         reply = handle_command(text)
         speak(reply)
 
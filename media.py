@@ -0,0 +1,150 @@
+# media.py
+# Resolves "play ..." queries to a YouTube URL without searching every time.
+#
+# Lookup order:
+#   1. musicLibrary.music (hand-picked links)
+#   2. media_index.json - every query resolved before, query -> video ID
+#   3. network search (YouTube Data API if YOUTUBE_API_KEY is set, else the
+#      results page), recorded in the index for next time
+#
+# Queries are normalized (lowercase, no punctuation, filler words like
+# "song" / "video" / "on youtube" removed) and matched fuzzily, so
+# "play skyfall song" finds the "skyfall" entry.
+
+import os
+import re
+import json
+import time
+import threading
+import urllib.parse
+from difflib import SequenceMatcher
+
+import http_client
+import musicLibrary
+
+INDEX_FILE = os.getenv("JARVIS_MEDIA_INDEX", "media_index.json")
+MAX_INDEX_ENTRIES = 2000
+# Similarity needed for a fuzzy hit (1.0 = identical after normalizing)
+FUZZY_MIN_SCORE = 0.85
+FILLER_WORDS = {
+    "a", "the", "some", "me", "please", "song", "songs", "music", "video",
+    "videos", "official", "audio", "lyrics", "lyric", "full", "on", "youtube",
+    "play", "track",
+}
+VIDEO_ID_RE = re.compile(r"watch\?v=([\w-]{11})")
+
+_lock = threading.Lock()
+_index = None  # normalized query -> {"video_id", "uses", "last_used"}
+
+
+def normalize(query: str) -> str:
+    words = re.sub(r"[^\w\s]", " ", (query or "").lower()).split()
+    kept = [w for w in words if w not in FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+def _similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    # "skyfall adele" vs "skyfall": one side's words all in the other -
+    # scored by how many of all the words overlap, so a cached "lofi" does
+    # not answer every "lofi <something>"
+    wa, wb = set(a.split()), set(b.split())
+    ratio = SequenceMatcher(None, a, b).ratio()
+    if wa and wb and (wa <= wb or wb <= wa):
+        return max(ratio, len(wa & wb) / len(wa | wb))
+    return ratio
+
+
+def _best_match(query: str, keys):
+    best_key, best_score = None, 0.0
+    for key in keys:
+        score = _similarity(query, key)
+        if score > best_score:
+            best_key, best_score = key, score
+    return best_key if best_score >= FUZZY_MIN_SCORE else None
+
+
+# ================== PERSISTENT INDEX ==================
+def _load_index():
+    global _index
+    if _index is None:
+        _index = {}
+        if os.path.exists(INDEX_FILE):
+            try:
+                with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                    _index = json.load(f)
+            except Exception as e:
+                print("[MEDIA] Failed to load index:", e)
+    return _index
+
+
+def _save_index():
+    tmp = INDEX_FILE + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_index, f, indent=2)
+        os.replace(tmp, INDEX_FILE)
+    except Exception as e:
+        print("[MEDIA] Failed to save index:", e)
+
+
+def record(query: str, video_id: str):
+    """Remember that query resolved to video_id."""
+    key = normalize(query)
+    with _lock:
+        index = _load_index()
+        entry = index.setdefault(key, {"uses": 0})
+        entry.update(video_id=video_id, last_used=time.time(), uses=entry["uses"] + 1)
+        if len(index) > MAX_INDEX_ENTRIES:
+            # Forget the least recently played
+            for old in sorted(index, key=lambda k: index[k]["last_used"])[: len(index) - MAX_INDEX_ENTRIES]:
+                del index[old]
+        _save_index()
+
+
+# ================== NETWORK SEARCH ==================
+def search_video_id(query: str):
+    """First YouTube result for query, or None."""
+    api_key = os.getenv("YOUTUBE_API_KEY")
+    if api_key:
+        # Small JSON answer instead of the full results page
+        data = http_client.get_json(
+            "https://www.googleapis.com/youtube/v3/search",
+            params={"part": "id", "type": "video", "maxResults": 1, "q": query,
+                    "fields": "items/id/videoId", "key": api_key},
+        )
+        items = data.get("items") or []
+        return items[0]["id"]["videoId"] if items else None
+
+    html = http_client.get("https://www.youtube.com/results?search_query=" + urllib.parse.quote(query)).text
+    match = VIDEO_ID_RE.search(html)
+    return match.group(1) if match else None
+
+
+# ================== RESOLVER ==================
+def resolve(query: str):
+    """
+    (url, source) for query, source being "library", "cache" or "search".
+    Returns (None, None) if nothing was found.
+    """
+    key = normalize(query)
+
+    library = {normalize(name): url for name, url in musicLibrary.music.items()}
+    hit = _best_match(key, library)
+    if hit:
+        return library[hit], "library"
+
+    with _lock:
+        index = _load_index()
+        hit = _best_match(key, index)
+        video_id = index[hit]["video_id"] if hit else None
+    if video_id:
+        record(hit, video_id)
+        return "https://www.youtube.com/watch?v=" + video_id, "cache"
+
+    video_id = search_video_id(query)
+    if not video_id:
+        return None, None
+    record(query, video_id)
+    return "https://www.youtube.com/watch?v=" + video_id, "search"
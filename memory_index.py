@@ -0,0 +1,181 @@
+# memory_index.py
+# Semantic index over the personal memory store (notes, reminders, study
+# plans), so "what did I tell you about my exam" reads back the few items
+# that match instead of everything.
+#
+# main.save_memory() calls sync() with the memory dict; new items are
+# queued and embedded in batches of up to BATCH_SIZE by a background
+# worker (the MiniLM model the knowledge base already loads), removed
+# items are dropped. Vectors live in one normalized (N, dim) matrix, so a
+# search is a single matrix-vector product. A search waits at most
+# SEARCH_WAIT_SEC for the worker to catch up; without a worker it embeds
+# only the newest batch itself, never the whole backlog.
+
+import hashlib
+import threading
+
+import numpy as np
+
+import knowledge
+
+BATCH_SIZE = 32
+MIN_SCORE = 0.35  # cosine similarity needed to count as a match
+PLAN_CHARS = 400  # how much of a plan's text is embedded
+SEARCH_WAIT_SEC = 1.5
+
+_lock = threading.Lock()
+_vectors = None  # (N, dim) normalized embeddings
+_items = []  # parallel to _vectors: {"key", "kind", "text", "label"}
+_pending = {}  # key -> item waiting to be embedded
+_wake = threading.Event()
+_idle = threading.Event()  # set while nothing is waiting to be embedded
+_idle.set()
+_stop_event = threading.Event()
+_thread = None
+_disabled = False
+
+
+def _key(kind: str, text: str) -> str:
+    return hashlib.sha1(f"{kind}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _memory_items(memory: dict) -> dict:
+    """Every indexable item in memory, keyed by content hash."""
+    items = {}
+
+    def add(kind, text, label):
+        text = (text or "").strip()
+        if text:
+            items[_key(kind, text)] = {"kind": kind, "text": text, "label": label}
+
+    for note in memory.get("notes", []):
+        add("note", note, note)
+    for r in memory.get("reminders", []):
+        add("reminder", r.get("text"), r.get("text"))
+    for p in memory.get("plans", []):
+        topic = p.get("topic") or ""
+        add("plan", f"study plan for {topic}: {(p.get('plan') or '')[:PLAN_CHARS]}", topic)
+    return items
+
+
+# ================== INDEXING ==================
+def sync(memory: dict):
+    """Bring the index in line with memory; new items are embedded in the background."""
+    global _vectors, _items
+    current = _memory_items(memory)
+    with _lock:
+        keep = [i for i, item in enumerate(_items) if item["key"] in current]
+        if len(keep) < len(_items):
+            _items = [_items[i] for i in keep]
+            _vectors = _vectors[keep] if keep else None
+        indexed = {item["key"] for item in _items}
+        for key in list(_pending):
+            if key not in current:
+                del _pending[key]
+        for key, item in current.items():
+            if key not in indexed and key not in _pending:
+                _pending[key] = dict(item, key=key)
+        queued = bool(_pending)
+        if not queued:
+            _idle.set()
+    if queued:
+        _idle.clear()
+        _wake.set()
+
+
+def _embed_pending(newest: bool = False):
+    """Embed up to BATCH_SIZE queued items (oldest or newest first) in one model call."""
+    global _vectors, _disabled
+    with _lock:
+        queued = list(_pending.values())
+        batch = queued[-BATCH_SIZE:] if newest else queued[:BATCH_SIZE]
+    if not batch or _disabled:
+        return 0
+    try:
+        vecs = knowledge._get_model().encode([item["text"] for item in batch], batch_size=BATCH_SIZE)
+    except Exception as e:
+        print("[MEMORY INDEX] Embedding model unavailable, disabling:", e)
+        _disabled = True
+        return 0
+    vecs = np.asarray(vecs, dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    vecs = vecs / np.where(norms == 0, 1, norms)
+
+    with _lock:
+        # Only items still queued (sync may have removed some meanwhile)
+        fresh = [i for i, item in enumerate(batch) if _pending.pop(item["key"], None) is not None]
+        if fresh:
+            _items.extend(batch[i] for i in fresh)
+            _vectors = vecs[fresh] if _vectors is None else np.vstack([_vectors, vecs[fresh]])
+        if not _pending:
+            _idle.set()
+    return len(batch)
+
+
+def _loop():
+    while not _stop_event.is_set():
+        _wake.wait()
+        _wake.clear()
+        if _stop_event.is_set():
+            break
+        try:
+            while _embed_pending():
+                pass
+        except Exception as e:
+            print("[MEMORY INDEX] Indexing error:", e)
+
+
+def start(memory: dict = None):
+    """Start the indexing worker (no-op if already running) and index memory."""
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _stop_event.clear()
+        _thread = threading.Thread(target=_loop, daemon=True, name="jarvis-memory-index")
+        _thread.start()
+    if memory is not None:
+        sync(memory)
+
+
+def stop(timeout: float = 5.0):
+    global _thread
+    _stop_event.set()
+    _wake.set()
+    if _thread is not None:
+        _thread.join(timeout=timeout)
+    _thread = None
+
+
+# ================== SEARCH ==================
+def search(query: str, k: int = 3, min_score: float = MIN_SCORE) -> list:
+    """Top-k items for query as [{"kind", "text", "label", "score"}], best first."""
+    # Let the worker finish what was added moments ago, but not for long
+    if _pending:
+        if _thread is not None and _thread.is_alive():
+            _idle.wait(SEARCH_WAIT_SEC)
+        else:
+            _embed_pending(newest=True)
+    if _disabled or not query.strip():
+        return []
+    try:
+        vec = np.asarray(knowledge._get_model().encode([query])[0], dtype=np.float32)
+    except Exception as e:
+        print("[MEMORY INDEX] Query embedding failed:", e)
+        return []
+    norm = np.linalg.norm(vec)
+    if not norm:
+        return []
+    with _lock:
+        if _vectors is None:
+            return []
+        scores = _vectors @ (vec / norm)
+        order = np.argsort(-scores)[:k]
+        return [
+            dict(_items[i], score=round(float(scores[i]), 3))
+            for i in order
+            if scores[i] >= min_score
+        ]
+
+
+def stats() -> dict:
+    with _lock:
+        return {"indexed": len(_items), "pending": len(_pending), "disabled": _disabled}
@@ -1,10 +1,10 @@
-import requests
+import http_client
 
 URL = "https://newsapi.org/v2/top-headlines?country=us&apiKey=68d7d515d90f49e99b353043d1327513"
 
 def get_headlines():
     try:
-        response = requests.get(URL)
+        response = http_client.get(URL)
         data = response.json()
     except Exception as e:
         print("News request error:", e)
@@ -0,0 +1,143 @@
+# prefetch.py
+# Keeps ready-to-speak briefings (default-city weather, top headlines) in
+# memory so the most common commands answer without touching the network.
+#
+# Each job is refreshed at startup and then on its own schedule. The
+# schedule adapts to how often the user actually asks: frequent asks pull
+# the interval down towards min_interval, silence lets it drift up to
+# max_interval (never asked -> max_interval). A briefing older than its
+# max_age is not served, so max_interval is capped at REFRESH_AT_AGE of
+# max_age: even an idle job is refreshed before its briefing goes stale.
+
+import time
+import threading
+from collections import deque
+
+# Asks older than this no longer influence the refresh rate
+ADAPT_WINDOW_SEC = 6 * 3600
+# Refresh about twice per typical gap between asks
+REFRESHES_PER_ASK_GAP = 2
+# Scheduler wakes at least this often to re-check due jobs
+MAX_SLEEP_SEC = 30
+# Refresh once a briefing has used this share of its max_age
+REFRESH_AT_AGE = 0.75
+
+_lock = threading.Lock()
+_jobs = {}  # name -> job dict
+_stop_event = threading.Event()
+_thread = None
+
+
+def register(name: str, build, min_interval: float, max_interval: float, max_age: float = None):
+    """
+    build() -> briefing string, or None / raise on failure (old one is kept).
+    max_age caps how old a served briefing may be (default: max_interval);
+    max_interval is lowered to REFRESH_AT_AGE * max_age so one always is.
+    Re-registering a name replaces the job but keeps its ask history.
+    """
+    if max_age:
+        max_interval = min(max_interval, REFRESH_AT_AGE * max_age)
+        min_interval = min(min_interval, max_interval)
+    with _lock:
+        old = _jobs.get(name)
+        _jobs[name] = {
+            "build": build,
+            "min": min_interval,
+            "max": max_interval,
+            "max_age": max_age or max_interval,
+            "text": old["text"] if old else None,
+            "updated": old["updated"] if old else 0.0,
+            "next_due": 0.0,  # refresh right away
+            "asks": old["asks"] if old else deque(maxlen=50),
+        }
+
+
+def _interval(job, now: float) -> float:
+    asks = [t for t in job["asks"] if now - t <= ADAPT_WINDOW_SEC]
+    if len(asks) < 2:
+        return job["max"]
+    gap = (asks[-1] - asks[0]) / (len(asks) - 1)
+    return max(job["min"], min(job["max"], gap / REFRESHES_PER_ASK_GAP))
+
+
+def get(name: str):
+    """Cached briefing for name (counts as an ask), or None if not ready / too old."""
+    now = time.time()
+    with _lock:
+        job = _jobs.get(name)
+        if job is None:
+            return None
+        job["asks"].append(now)
+        # Pull the next refresh forward if the user started asking more often
+        job["next_due"] = min(job["next_due"], job["updated"] + _interval(job, now))
+        if job["text"] and now - job["updated"] <= job["max_age"]:
+            return job["text"]
+    return None
+
+
+def refresh(name: str):
+    """Rebuild one briefing now (called by the scheduler)."""
+    with _lock:
+        job = _jobs.get(name)
+    if job is None:
+        return
+    try:
+        text = job["build"]()
+    except Exception as e:
+        print(f"[PREFETCH] {name} refresh failed:", e)
+        text = None
+    now = time.time()
+    with _lock:
+        if text:
+            job["text"] = text
+            job["updated"] = now
+        interval = _interval(job, now)
+        # Failed refreshes retry sooner, but not in a tight loop
+        job["next_due"] = now + (interval if text else job["min"])
+    if text:
+        print(f"[PREFETCH] {name} refreshed, next in {interval / 60:.0f} min")
+
+
+def _loop():
+    while not _stop_event.is_set():
+        now = time.time()
+        with _lock:
+            due = [name for name, job in _jobs.items() if job["next_due"] <= now]
+        for name in due:
+            if _stop_event.is_set():
+                return
+            refresh(name)
+        with _lock:
+            next_due = min((job["next_due"] for job in _jobs.values()), default=now + MAX_SLEEP_SEC)
+        _stop_event.wait(max(1.0, min(MAX_SLEEP_SEC, next_due - time.time())))
+
+
+def start():
+    """Start the scheduler (no-op if already running); jobs refresh at once."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    _thread = threading.Thread(target=_loop, daemon=True, name="jarvis-prefetch")
+    _thread.start()
+
+
+def stop(timeout: float = 5.0):
+    global _thread
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout=timeout)
+    _thread = None
+
+
+def status() -> dict:
+    now = time.time()
+    with _lock:
+        return {
+            name: {
+                "ready": bool(job["text"]),
+                "age_sec": round(now - job["updated"]) if job["updated"] else None,
+                "interval_sec": round(_interval(job, now)),
+            }
+            for name, job in _jobs.items()
+        }
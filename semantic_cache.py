@@ -0,0 +1,189 @@
+# semantic_cache.py
+# Semantic cache for GPT fallback answers: "explain recursion" can reuse
+# the answer to "what is recursion" without another model call.
+#
+# Prompts are embedded with the MiniLM model the knowledge base already
+# loads (knowledge._get_model), normalized, and compared by cosine
+# similarity against earlier prompts. A hit needs SIMILARITY_THRESHOLD
+# and an entry younger than its TTL; the cache holds at most MAX_ENTRIES
+# (least recently used evicted).
+#
+# Embeddings barely move when only a number changes ("15% of 80" vs "15%
+# of 90"), so a hit also needs the same numbers in both prompts, and short
+# prompts - where one swapped name is most of the meaning - need
+# SHORT_PROMPT_THRESHOLD. Answers from the local fallback model expire
+# after LOCAL_TTL_SEC, so better OpenAI answers replace them once it is back.
+#
+# Not cached: follow-ups that lean on the conversation ("and his age?")
+# and time-sensitive questions ("what is happening today").
+
+import os
+import re
+import time
+import threading
+
+import numpy as np
+
+import knowledge
+
+SIMILARITY_THRESHOLD = float(os.getenv("JARVIS_SEMANTIC_THRESHOLD", "0.9"))
+SHORT_PROMPT_THRESHOLD = float(os.getenv("JARVIS_SEMANTIC_SHORT_THRESHOLD", "0.97"))
+SHORT_PROMPT_WORDS = 8
+TTL_SEC = 7 * 24 * 3600
+LOCAL_TTL_SEC = 15 * 60  # answers from the local llama.cpp model
+MAX_ENTRIES = 500
+
+# Words that make a prompt depend on earlier turns
+FOLLOW_UP_RE = re.compile(
+    r"^(and|also|but|so|then|what about|how about)\b"
+    r"|\b(he|she|it|they|him|her|his|hers|its|them|their|that|this|those|these|there)\b"
+)
+TIME_SENSITIVE_RE = re.compile(r"\b(today|tonight|now|current|currently|latest|this week|yesterday|tomorrow)\b")
+NUMBER_RE = re.compile(
+    r"\d+(?:[.,]\d+)?|\b(?:zero|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|"
+    r"thirteen|fourteen|fifteen|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|"
+    r"sixty|seventy|eighty|ninety|hundred|thousand|million|billion|half|quarter)\b"
+)
+
+_lock = threading.Lock()
+_vectors = None  # (N, dim) normalized embeddings
+_entries = []  # parallel to _vectors: {"prompt", "answer", "numbers", "backend", "ttl", "stored", "last_hit"}
+_stats = {"lookups": 0, "hits": 0, "misses": 0, "skipped": 0, "stored": 0}
+_disabled = False
+
+
+def _embed(text: str):
+    global _disabled
+    if _disabled:
+        return None
+    try:
+        vec = np.asarray(knowledge._get_model().encode([text])[0], dtype=np.float32)
+    except Exception as e:
+        print("[SEMANTIC CACHE] Embedding model unavailable, disabling:", e)
+        _disabled = True
+        return None
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else None
+
+
+def cacheable(prompt: str, has_context: bool = False) -> bool:
+    """False for time-sensitive prompts and (with history) likely follow-ups."""
+    text = prompt.lower().strip()
+    if TIME_SENSITIVE_RE.search(text):
+        return False
+    if has_context and FOLLOW_UP_RE.search(text):
+        return False
+    return True
+
+
+def _numbers(prompt: str) -> list:
+    return sorted(NUMBER_RE.findall(prompt.lower()))
+
+
+def _threshold(prompt: str) -> float:
+    if len(prompt.split()) <= SHORT_PROMPT_WORDS:
+        return max(SIMILARITY_THRESHOLD, SHORT_PROMPT_THRESHOLD)
+    return SIMILARITY_THRESHOLD
+
+
+def _drop(indexes):
+    global _vectors, _entries
+    gone = set(indexes)
+    keep = [i for i in range(len(_entries)) if i not in gone]
+    _entries = [_entries[i] for i in keep]
+    _vectors = _vectors[keep] if keep else None
+
+
+def lookup(prompt: str, has_context: bool = False):
+    """Cached answer for a similar earlier prompt, or None."""
+    with _lock:
+        _stats["lookups"] += 1
+    if not cacheable(prompt, has_context):
+        with _lock:
+            _stats["skipped"] += 1
+        return None
+    vec = _embed(prompt)
+    if vec is None:
+        return None
+
+    now = time.time()
+    with _lock:
+        if _vectors is None:
+            _stats["misses"] += 1
+            return None
+        expired = [i for i, e in enumerate(_entries) if now - e["stored"] > e["ttl"]]
+        if expired:
+            _drop(expired)
+            if _vectors is None:
+                _stats["misses"] += 1
+                return None
+        scores = _vectors @ vec
+        # Best close-enough entry asking about the same numbers
+        numbers = _numbers(prompt)
+        threshold = _threshold(prompt)
+        best = None
+        for i in np.argsort(-scores):
+            if scores[i] < threshold:
+                break
+            if _entries[i]["numbers"] == numbers:
+                best = int(i)
+                break
+        if best is None:
+            _stats["misses"] += 1
+            return None
+        entry = _entries[best]
+        entry["last_hit"] = now
+        _stats["hits"] += 1
+    print(f"[SEMANTIC CACHE] Hit ({scores[best]:.2f}): {prompt!r} ~ {entry['prompt']!r}")
+    return entry["answer"]
+
+
+def store(prompt: str, answer: str, has_context: bool = False, backend: str = None):
+    """
+    Remember answer for prompt (skipped for follow-ups / time-sensitive
+    prompts). backend is the llm.py backend that produced it.
+    """
+    global _vectors
+    if not answer or not cacheable(prompt, has_context):
+        return
+    vec = _embed(prompt)
+    if vec is None:
+        return
+    now = time.time()
+    with _lock:
+        _entries.append({
+            "prompt": prompt,
+            "answer": answer,
+            "numbers": _numbers(prompt),
+            "backend": backend,
+            "ttl": LOCAL_TTL_SEC if backend == "local" else TTL_SEC,
+            "stored": now,
+            "last_hit": now,
+        })
+        _vectors = vec[None, :] if _vectors is None else np.vstack([_vectors, vec])
+        if len(_entries) > MAX_ENTRIES:
+            oldest = sorted(range(len(_entries)), key=lambda i: _entries[i]["last_hit"])
+            _drop(oldest[: len(_entries) - MAX_ENTRIES])
+        _stats["stored"] += 1
+
+
+def warm_up_async():
+    """Load the embedding model in the background so the first lookup is fast."""
+    threading.Thread(target=_embed, args=("warm up",), daemon=True, name="jarvis-semantic-warmup").start()
+
+
+def clear():
+    global _vectors, _entries
+    with _lock:
+        _vectors = None
+        _entries = []
+
+
+def stats() -> dict:
+    with _lock:
+        answered = _stats["hits"] + _stats["misses"]
+        return dict(
+            _stats,
+            entries=len(_entries),
+            hit_rate=round(_stats["hits"] / answered, 3) if answered else None,
+        )
@@ -1,8 +1,44 @@
-from flask import Flask, request, jsonify, render_template
-from main import handle_command, get_status, speak
+import os
+import sys
+import json
+import queue
+import signal
+import threading
+
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, abort
+from main import handle_command, get_status, speak, start_background_services, stop_background_services
+import speech
+import tts_cache
+import ipc
+import events
+import telemetry
+import http_client
+import cache
+import semantic_cache
+import vad
+
+# ================== SERVING CONFIG ==================
+HOST = os.getenv("JARVIS_HOST", "0.0.0.0")  # 0.0.0.0 so phone on same Wi-Fi can open the UI
+PORT = int(os.getenv("JARVIS_PORT", "5001"))
+# Request worker threads. Each open /events stream holds one thread for as
+# long as the HUD is connected, so streams are capped at MAX_EVENT_STREAMS.
+# /ask may use what is left minus RESERVED_THREADS, so slow GPT / camera
+# commands never starve /status and the HUD.
+THREADS = int(os.getenv("JARVIS_THREADS", "10"))
+RESERVED_THREADS = 2
+MAX_EVENT_STREAMS = int(os.getenv("JARVIS_MAX_EVENT_STREAMS", "2"))
+ASK_QUEUE_WAIT_SEC = 10
+# Comment line sent on idle streams so proxies and browsers keep them open
+EVENT_HEARTBEAT_SEC = 15
 
 app = Flask(__name__)
 
+_ask_slots = threading.BoundedSemaphore(max(1, THREADS - RESERVED_THREADS - MAX_EVENT_STREAMS))
+_stream_slots = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+_ipc_server = None
+_shutdown_lock = threading.Lock()
+_shut_down = False
+
 
 @app.route("/")
 def index():
@@ -14,11 +50,22 @@ def ask_jarvis():
     data = request.get_json(force=True)
     message = data.get("message", "")
     print("[/ask] Message:", message)
+    if "endpoint_latency" in data:
+        vad.record_latency(data["endpoint_latency"])
 
-    reply = handle_command(message)
+    if not _ask_slots.acquire(timeout=ASK_QUEUE_WAIT_SEC):
+        return jsonify({"reply": "I am handling too many requests right now, sir. Try again in a moment."}), 503
+    try:
+        reply = handle_command(message, session=data.get("client"))
+    finally:
+        _ask_slots.release()
     print("[/ask] Reply:", reply)
+    _publish_reply(message, reply, data.get("client"))
 
-    # Frontend calls /speak to avoid double speaking
+    # The HUD calls /speak itself; other clients (wake word listener) can
+    # ask for the reply to be spoken here and skip the second round trip.
+    if data.get("speak") and reply:
+        speak(reply)
     return jsonify({"reply": reply})
 
 
@@ -27,6 +74,85 @@ def status():
     return jsonify(get_status())
 
 
+@app.route("/metrics/history")
+def metrics_history():
+    """
+    Rolling telemetry window for HUD graphs.
+    ?window=300 (seconds, max 600) &fields=cpu,ram,battery,temp,per_core
+    """
+    try:
+        window = min(float(request.args.get("window", 300)), telemetry.HISTORY_SECONDS)
+    except ValueError:
+        abort(400)
+    fields = [f for f in request.args.get("fields", "").split(",") if f] or None
+    return jsonify({
+        "interval": telemetry.SAMPLE_INTERVAL_SEC,
+        "latest": telemetry.latest(),
+        "samples": telemetry.history(window, fields),
+    })
+
+
+@app.route("/metrics/http")
+def metrics_http():
+    """Outbound API latency / error counts per host."""
+    return jsonify({"backend": http_client.backend_name(), "hosts": http_client.stats()})
+
+
+@app.route("/metrics/cache")
+def metrics_cache():
+    """Hit rates of the skill response cache and the GPT semantic cache."""
+    return jsonify({"responses": cache.stats(), "semantic": semantic_cache.stats()})
+
+
+@app.route("/metrics/voice")
+def metrics_voice():
+    """End-of-speech → dispatch latency (p50 / p95 / last) of voice commands."""
+    return jsonify({"endpointing": vad.latency_stats()})
+
+
+def _publish_reply(message, reply, client=None):
+    """Push a command/reply pair so every open HUD shows it (not just the asker)."""
+    if reply:
+        events.publish("reply", {"command": message, "text": reply, "client": client})
+
+
+def _sse(kind, data):
+    return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/events")
+def events_route():
+    """
+    Server-Sent Events stream for the HUD: status deltas, reminders,
+    security alerts and replies (including late skill answers).
+    """
+    if not _stream_slots.acquire(blocking=False):
+        # HUD falls back to polling /status
+        return jsonify({"error": "too many event streams"}), 503
+    q = events.subscribe()
+
+    def stream():
+        yield "retry: 3000\n\n"
+        yield _sse("status", get_status())
+        while not _shut_down:
+            try:
+                event = q.get(timeout=EVENT_HEARTBEAT_SEC)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event["type"], event["data"])
+
+    def close():
+        # Runs when the client disconnects (the next write fails) or on shutdown
+        events.unsubscribe(q)
+        _stream_slots.release()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    response = Response(stream(), mimetype="text/event-stream", headers=headers)
+    response.call_on_close(close)
+    return response
+
+
 @app.route("/speak", methods=["POST"])
 def speak_route():
     data = request.get_json(force=True)
@@ -37,6 +163,120 @@ def speak_route():
     return jsonify({"ok": True})
 
 
+@app.route("/speak/stop", methods=["POST"])
+def speak_stop_route():
+    """Stop the current utterance and drop anything still queued."""
+    speech.cancel_all()
+    return jsonify({"ok": True})
+
+
+@app.route("/tts")
+def tts_lookup_route():
+    """Return the URL of pre-rendered audio for ?text=..., if it is cached."""
+    text = request.args.get("text", "")
+    key = tts_cache.key_for_text(text) if text else None
+    if not key:
+        return jsonify({"cached": False}), 404
+    return jsonify({"cached": True, "url": f"/tts/{key}"})
+
+
+@app.route("/tts/<key>")
+def tts_file_route(key):
+    """Serve a cached phrase so the HUD can play it without re-synthesizing."""
+    path = tts_cache.path_for_key(key)
+    if not path:
+        abort(404)
+    return send_from_directory(os.path.abspath(tts_cache.CACHE_DIR), os.path.basename(path))
+
+
+def ipc_ask(request_data):
+    """Same as /ask, for the local Unix socket channel (see ipc.py)."""
+    message = request_data.get("message", "")
+    print("[ipc] Message:", message)
+    if "endpoint_latency" in request_data:
+        vad.record_latency(request_data["endpoint_latency"])
+    with _ask_slots:
+        reply = handle_command(message, session=request_data.get("client", "voice"))
+    print("[ipc] Reply:", reply)
+    _publish_reply(message, reply)
+    if request_data.get("speak") and reply:
+        speak(reply)
+    return {"reply": reply}
+
+
+# ================== STARTUP / SHUTDOWN ==================
+def startup():
+    """Start background threads and the local IPC socket (once per process)."""
+    global _ipc_server
+    start_background_services()
+    if _ipc_server is None:
+        # Local fast path for the wake word listener on the same machine
+        _ipc_server = ipc.start_server(ipc_ask)
+
+
+def shutdown():
+    """Graceful shutdown: close IPC, stop watchers, flush memory."""
+    global _shut_down, _ipc_server
+    with _shutdown_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+    print("JARVIS server shutting down...")
+    ipc.stop_server(_ipc_server)
+    _ipc_server = None
+    stop_background_services()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_production():
+    """
+    Threaded production server: waitress if installed, otherwise werkzeug's
+    threaded WSGI server (no debugger, no reloader).
+    """
+    startup()
+    # SIGTERM (launchd / kill) should shut down as cleanly as Ctrl+C
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    try:
+        try:
+            from waitress import serve
+        except ImportError:
+            serve = None
+
+        if serve is not None:
+            print(f"JARVIS server (waitress, {THREADS} threads) on http://{HOST}:{PORT}")
+            serve(app, host=HOST, port=PORT, threads=THREADS)
+        else:
+            from werkzeug.serving import make_server
+
+            server = make_server(HOST, PORT, app, threaded=True)
+            print(f"JARVIS server (werkzeug threaded) on http://{HOST}:{PORT}")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown()
+
+
+def run_dev():
+    """Flask dev server with debugger + reloader (for working on the code)."""
+    # With the reloader, this file runs in a watcher process and a child
+    # process; only the child (WERKZEUG_RUN_MAIN=true) serves requests.
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        startup()
+    try:
+        app.run(host=HOST, port=PORT, debug=True, threaded=True)
+    finally:
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            shutdown()
+
+
 if __name__ == "__main__":
-    # 0.0.0.0 so phone on same Wi-Fi can open the UI
-    app.run(host="0.0.0.0", port=5001, debug=True)
+    # python server.py        → production mode
+    # python server.py --dev  → Flask debug server with auto-reload
+    if "--dev" in sys.argv:
+        run_dev()
+    else:
+        run_production()
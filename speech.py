@@ -0,0 +1,374 @@
+# speech.py
+# Speech output service for JARVIS.
+# One worker thread speaks everything, so callers (Flask /speak, reminder
+# watcher, intruder watcher, CLI) return immediately and never talk over
+# each other.
+#
+# - Priority queue: intruder alert > reminder > normal reply
+# - A higher-priority message interrupts the current utterance
+# - Duplicate messages are coalesced (pending or just spoken)
+# - Pluggable backend: macOS 'say', espeak on Linux, or a plain file sink
+#   (see tts_backends.py)
+# - Recurring phrases are played from pre-rendered audio (tts_cache.py)
+# - Long replies are cleaned of markdown, split into sentences and pipelined:
+#   sentence N+1 is synthesized while sentence N plays
+
+import os
+import re
+import time
+import queue
+import heapq
+import shutil
+import tempfile
+import itertools
+import threading
+
+import tts_cache
+# Backend table lives in tts_backends (shared with tts_cache)
+from tts_backends import VOICE, backend_name, backend, can_play
+
+# Same text spoken again within this window is dropped
+DEDUP_WINDOW_SEC = 3.0
+
+# Sentence chunks for the pipelined path
+MIN_CHUNK_CHARS = 25  # shorter fragments are merged with the next one
+MAX_CHUNK_CHARS = 250  # longer sentences are split at , ; :
+# How many rendered sentences may wait ahead of the one playing
+PIPELINE_LOOKAHEAD = 2
+# Longest wait for the next rendered sentence before speaking the rest live
+RENDER_WAIT_SEC = 65
+
+PRIORITY_ALERT = 0
+PRIORITY_REMINDER = 1
+PRIORITY_REPLY = 2
+
+_lock = threading.Condition()
+_queue = []  # heap of [priority, seq, item]
+_seq = itertools.count()
+_current = {"item": None, "proc": None, "preempted": False, "stop": False}
+_recent = {}  # normalized text -> time it finished
+_worker = None
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+# ================== TEXT CLEANUP ==================
+_MD_PATTERNS = [
+    (re.compile(r"```.*?```", re.S), " "),  # code blocks
+    (re.compile(r"`([^`]*)`"), r"\1"),  # inline code
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),  # images
+    (re.compile(r"\[([^\]]*)\]\([^)]*\)"), r"\1"),  # links
+    (re.compile(r"(\*\*|__)(.*?)\1"), r"\2"),  # bold
+    (re.compile(r"(?<!\w)[*_](\S[^*_]*?)[*_](?!\w)"), r"\1"),  # italics
+    (re.compile(r"^\s{0,3}#{1,6}\s*", re.M), ""),  # headings
+    (re.compile(r"^\s*>\s?", re.M), ""),  # quotes
+    (re.compile(r"^\s*([-*+]|\d+[.)])\s+", re.M), ""),  # list bullets
+    (re.compile(r"^\s*([-*_]\s*){3,}$", re.M), ""),  # horizontal rules
+    (re.compile(r"\|"), " "),  # table pipes
+]
+
+
+def clean_for_speech(text: str) -> str:
+    """Strip markdown (GPT output) so the voice does not read symbols aloud."""
+    if not text:
+        return ""
+    for pattern, repl in _MD_PATTERNS:
+        text = pattern.sub(repl, text)
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        # Headings / bullet items usually lack punctuation: add a pause
+        if line[-1] not in ".!?:;,":
+            line += "."
+        lines.append(line)
+    return "\n".join(lines)
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_sentences(text: str):
+    """
+    Split text into speakable chunks: one sentence (or line) each, tiny
+    fragments merged forward, very long sentences cut at clause breaks.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= MAX_CHUNK_CHARS:
+            pieces.append(sentence)
+            continue
+        part = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if part and len(part) + len(clause) + 1 > MAX_CHUNK_CHARS:
+                pieces.append(part)
+                part = clause
+            else:
+                part = f"{part} {clause}".strip()
+        if part:
+            pieces.append(part)
+
+    chunks = []
+    buf = ""
+    for piece in pieces:
+        buf = f"{buf} {piece}".strip()
+        if len(buf) >= MIN_CHUNK_CHARS:
+            chunks.append(buf)
+            buf = ""
+    if buf:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {buf}"
+        else:
+            chunks.append(buf)
+    return chunks
+
+
+# ================== WORKER ==================
+def _run(start, *args) -> bool:
+    """Start one backend process and wait for it. False if interrupted."""
+    with _lock:
+        if _current["stop"]:
+            return False
+        proc = start(*args)  # may raise (e.g. player missing); caller handles it
+        _current["proc"] = proc
+    if proc is not None:
+        proc.wait()
+    with _lock:
+        _current["proc"] = None
+        return not _current["stop"]
+
+
+def _speak_pipelined(chunks, voice: str, funcs):
+    """
+    Render chunk N+1 in a helper thread while chunk N plays, so the first
+    audio starts after one sentence no matter how long the reply is.
+    """
+    workdir = tempfile.mkdtemp(prefix="jarvis_tts_")
+    ready = queue.Queue(maxsize=PIPELINE_LOOKAHEAD)
+    abort = threading.Event()
+
+    def put(entry):
+        while not abort.is_set():
+            try:
+                ready.put(entry, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def producer():
+        try:
+            for i, chunk in enumerate(chunks):
+                if abort.is_set():
+                    break
+                path = tts_cache.lookup(chunk, voice)
+                if not path:
+                    path = os.path.join(workdir, f"{i}{funcs['ext']}")
+                    try:
+                        if not funcs["render"](chunk, voice, path):
+                            path = None
+                    except Exception as e:
+                        print("[SPEECH] Sentence render error:", e)
+                        path = None
+                # None → consumer falls back to live synthesis for this chunk
+                put((chunk, path))
+        except Exception as e:
+            print("[SPEECH] Sentence producer failed:", e)
+        finally:
+            put(None)  # end of reply, also when the producer died
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+    played = 0
+    try:
+        while True:
+            try:
+                entry = ready.get(timeout=RENDER_WAIT_SEC)
+            except queue.Empty:
+                # Renderer is stuck: say whatever is left without it
+                print("[SPEECH] Sentence render timed out, speaking the rest live")
+                rest = " ".join(chunks[played:])
+                if rest:
+                    _run(funcs["speak"], rest, voice)
+                break
+            if entry is None:
+                if played < len(chunks):
+                    # Producer died part way: say the rest without it
+                    _run(funcs["speak"], " ".join(chunks[played:]), voice)
+                break
+            chunk, path = entry
+            ok = _run(funcs["play"], path) if path else _run(funcs["speak"], chunk, voice)
+            played += 1
+            if not ok:
+                break
+    finally:
+        abort.set()
+        # Unblock the producer if it is waiting on a full queue
+        while thread.is_alive():
+            try:
+                ready.get(timeout=0.2)
+            except queue.Empty:
+                pass
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _speak_now(item):
+    """Run one utterance on the backend and wait for it (interruptible)."""
+    funcs = backend()
+    text, voice = item["text"], item["voice"]
+    # No audio player (e.g. espeak without aplay): everything is spoken live
+    playable = can_play()
+
+    if funcs["render"] is not None and playable:
+        chunks = split_sentences(text)
+        if len(chunks) > 1 and not tts_cache.lookup(text, voice):
+            _speak_pipelined(chunks, voice, funcs)
+            return
+
+    if playable:
+        # Whole phrase already rendered → just play the file
+        path = tts_cache.lookup(text, voice)
+        if path:
+            _run(funcs["play"], path)
+            return
+
+        # Fixed prefix rendered ("Reminder, sir:") → play it, synthesize the rest
+        prefix_path, rest = tts_cache.lookup_prefix(text, voice)
+        if prefix_path:
+            if _run(funcs["play"], prefix_path) and rest:
+                _run(funcs["speak"], rest, voice)
+            return
+
+    _run(funcs["speak"], text, voice)
+
+
+def _worker_loop():
+    while True:
+        with _lock:
+            while not _queue:
+                _lock.wait()
+            _, _, item = heapq.heappop(_queue)
+            _current["item"] = item
+            _current["preempted"] = False
+            _current["stop"] = False
+
+        try:
+            _speak_now(item)
+        except Exception as e:
+            print("[JARVIS SPEAK ERROR]", e)
+
+        with _lock:
+            if _current["preempted"]:
+                # Interrupted by something more urgent: say it again afterwards
+                heapq.heappush(_queue, [item["priority"], next(_seq), item])
+            else:
+                _recent[item["key"]] = time.time()
+            _current["item"] = None
+            _current["proc"] = None
+            _lock.notify_all()
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    backend_name()
+    _worker = threading.Thread(target=_worker_loop, daemon=True, name="jarvis-speech")
+    _worker.start()
+
+
+def _stop_current_locked():
+    if _current["item"] is not None:
+        _current["stop"] = True
+    proc = _current["proc"]
+    if proc is not None and proc.poll() is None:
+        try:
+            proc.terminate()
+        except Exception as e:
+            print("[SPEECH] Could not stop utterance:", e)
+
+
+# ================== PUBLIC API ==================
+def say(text: str, priority: int = PRIORITY_REPLY, voice: str = None) -> bool:
+    """
+    Queue text to be spoken and return immediately.
+    Returns False if the message was coalesced with an identical one.
+    """
+    text = clean_for_speech(text)
+    if not text:
+        return False
+
+    key = _normalize(text)
+    now = time.time()
+    with _lock:
+        _ensure_worker()
+
+        # Drop old entries from the recently-spoken table
+        for k, t in list(_recent.items()):
+            if now - t > DEDUP_WINDOW_SEC:
+                del _recent[k]
+        if key in _recent:
+            return False
+
+        current = _current["item"]
+        if current is not None and current["key"] == key:
+            return False
+
+        for entry in _queue:
+            if entry[2]["key"] == key:
+                # Already waiting: keep one copy at the more urgent priority
+                if priority < entry[0]:
+                    entry[0] = priority
+                    entry[2]["priority"] = priority
+                    heapq.heapify(_queue)
+                return False
+
+        item = {"text": text, "key": key, "priority": priority, "voice": voice or VOICE}
+        heapq.heappush(_queue, [priority, next(_seq), item])
+
+        # More urgent than what is playing right now → cut it off
+        if current is not None and priority < current["priority"]:
+            _current["preempted"] = True
+            _stop_current_locked()
+
+        _lock.notify_all()
+    return True
+
+
+def interrupt():
+    """Stop the current utterance (it is not repeated)."""
+    with _lock:
+        _current["preempted"] = False
+        _stop_current_locked()
+
+
+def cancel_all():
+    """Drop everything queued and stop the current utterance."""
+    with _lock:
+        _queue.clear()
+        _current["preempted"] = False
+        _stop_current_locked()
+        _lock.notify_all()
+
+
+def is_speaking() -> bool:
+    with _lock:
+        return _current["item"] is not None or bool(_queue)
+
+
+def wait_idle(timeout: float = None) -> bool:
+    """Block until the queue is empty and nothing is playing (CLI mode)."""
+    deadline = None if timeout is None else time.time() + timeout
+    with _lock:
+        while _current["item"] is not None or _queue:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            _lock.wait(remaining)
+    return True
@@ -18,6 +18,12 @@ document.addEventListener("DOMContentLoaded", () => {
 
     const WAKE_WORD = "jarvis";
 
+    // Identifies this tab's own /ask replies on the event stream
+    const CLIENT_ID = Math.random().toString(36).slice(2);
+
+    // Reply being streamed token by token for this tab (see "reply_delta")
+    let streamingDiv = null;
+
     // --------------------------
     //   BASIC CHAT UI HELPERS
     // --------------------------
@@ -100,41 +106,129 @@ document.addEventListener("DOMContentLoaded", () => {
             const res = await fetch("/ask", {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ message: text })
+                body: JSON.stringify({ message: text, client: CLIENT_ID })
             });
             const data = await res.json();
             const reply = data.reply || "I did not get a reply from the server.";
-            addMessage(reply, "jarvis");
+            if (streamingDiv) {
+                // Tokens already on screen: settle on the final text
+                streamingDiv.textContent = "JARVIS: " + reply;
+                streamingDiv = null;
+            } else {
+                addMessage(reply, "jarvis");
+            }
 
             // Mac speaks reply (once)
             speak(reply);
         } catch (err) {
             console.error("Backend error:", err);
+            streamingDiv = null;
             addMessage("There was an error contacting the server.", "jarvis");
             speak("There was an error contacting the server, sir.");
         }
     }
 
     // --------------------------
-    //   STATUS POLLING (HUD)
+    //   STATUS (HUD)
     // --------------------------
+    function applyStatus(data) {
+        if (hudTime && data.time) {
+            hudTime.textContent = data.time;
+        }
+        if (hudBattery && data.battery != null) {
+            hudBattery.textContent = data.battery + "%";
+        }
+    }
+
     async function pollStatus() {
         try {
             const res = await fetch("/status");
-            const data = await res.json();
-            if (hudTime && data.time) {
-                hudTime.textContent = data.time;
-            }
-            if (hudBattery && data.battery != null) {
-                hudBattery.textContent = data.battery + "%";
-            }
+            applyStatus(await res.json());
         } catch (e) {
             // ignore errors
         }
     }
 
-    setInterval(pollStatus, 5000);
+    // Polling is only the fallback while the event stream is down
+    let pollTimer = null;
+
+    function startPolling() {
+        if (pollTimer) return;
+        pollStatus();
+        pollTimer = setInterval(pollStatus, 5000);
+    }
+
+    function stopPolling() {
+        if (!pollTimer) return;
+        clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    // --------------------------
+    //   EVENT STREAM (/events)
+    // --------------------------
+    // The server pushes status deltas, reminders, security alerts and
+    // replies. Anything arriving here was already spoken on the Mac,
+    // so it is only shown, never sent back to /speak.
+    function onEvent(type, handler) {
+        return (e) => {
+            try {
+                handler(JSON.parse(e.data));
+            } catch (err) {
+                console.log("Bad " + type + " event:", err);
+            }
+        };
+    }
+
+    function connectEvents() {
+        if (!("EventSource" in window)) {
+            startPolling();
+            return;
+        }
+        const source = new EventSource("/events");
+
+        source.addEventListener("open", stopPolling);
+        source.addEventListener("status", onEvent("status", applyStatus));
+
+        source.addEventListener("reminder", onEvent("reminder", (data) => {
+            addMessage("Reminder, sir: " + data.text, "jarvis");
+        }));
+
+        source.addEventListener("security", onEvent("security", (data) => {
+            if (data.alert === "intruder") {
+                document.body.classList.add("red-alert");
+                playRedAlertSound();
+                addMessage("Intruder detected, sir. Red alert protocol active.", "jarvis");
+            }
+        }));
+
+        source.addEventListener("reply", onEvent("reply", (data) => {
+            // Our own /ask replies are already on screen
+            if (data.client === CLIENT_ID) return;
+            if (data.command) addMessage(data.command, "user");
+            addMessage(data.text, "jarvis");
+        }));
+
+        source.addEventListener("reply_delta", onEvent("reply_delta", (data) => {
+            if (data.client !== CLIENT_ID || !chatBox) return;
+            if (!streamingDiv) {
+                streamingDiv = document.createElement("div");
+                streamingDiv.className = "msg-jarvis";
+                streamingDiv.textContent = "JARVIS: ";
+                chatBox.appendChild(streamingDiv);
+            }
+            streamingDiv.textContent += data.text;
+            chatBox.scrollTop = chatBox.scrollHeight;
+        }));
+
+        source.onerror = () => {
+            // EventSource reconnects on its own; keep the HUD fresh meanwhile
+            startPolling();
+        };
+    }
+
     pollStatus();
+    connectEvents();
 
     // --------------------------
     //   VOICE RECOGNITION
@@ -0,0 +1,186 @@
+# stt.py
+# Speech-to-text backends for JARVIS (used by main.listen and wakeword_listener).
+#
+# - "google": speech_recognition + recognize_google (records the whole phrase,
+#             then one round trip to Google)
+# - "vosk":   offline streaming recognizer on CPU; decodes while the user is
+#             still talking and reports partial results as they come in
+# - "auto":   vosk if a model is configured and installed, else google
+#
+# PcmStream decodes raw 16-bit mono PCM fed frame by frame (from the shared
+# audio pipeline in audio_pipeline.py or the microphone) with the same
+# backends. The end of the command is found by the VAD endpointer (vad.py).
+#
+# Ambient noise calibration is done once and reused for CALIBRATION_TTL_SEC
+# instead of spending 0.4s on it before every command.
+
+import os
+import json
+import time
+
+import speech_recognition as sr
+
+import vad
+
+STT_BACKEND = os.getenv("STT_BACKEND", "auto")
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-in-0.4")
+LANGUAGE = "en-IN"
+
+# Re-measure background noise this often (seconds)
+CALIBRATION_TTL_SEC = 300
+CALIBRATION_DURATION = 0.4
+
+# Microphone capture format (16 kHz works for WebRTC VAD, Vosk and Google)
+MIC_SAMPLE_RATE = 16000
+MIC_CHUNK = 480  # 30ms
+
+recognizer = sr.Recognizer()
+recognizer.dynamic_energy_threshold = True
+
+_calibrated_at = 0.0
+_vosk_model = None
+_backend = None
+
+
+# ================== BACKEND SELECTION ==================
+def _vosk_available() -> bool:
+    if not os.path.isdir(VOSK_MODEL_PATH):
+        return False
+    try:
+        import vosk  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def backend_name() -> str:
+    global _backend
+    if _backend is None:
+        name = STT_BACKEND
+        if name == "auto":
+            name = "vosk" if _vosk_available() else "google"
+        if name == "vosk" and not _vosk_available():
+            print(f"[STT] Vosk model not found at {VOSK_MODEL_PATH}, using google.")
+            name = "google"
+        print(f"[STT] Backend: {name}")
+        _backend = name
+    return _backend
+
+
+def set_backend(name: str):
+    global _backend
+    if name not in ("google", "vosk"):
+        raise ValueError(f"Unknown STT backend: {name}")
+    _backend = name
+
+
+def _get_vosk_model():
+    """Load the Vosk model once and keep it resident."""
+    global _vosk_model
+    if _vosk_model is None:
+        import vosk
+
+        vosk.SetLogLevel(-1)
+        print(f"[STT] Loading Vosk model: {VOSK_MODEL_PATH}")
+        _vosk_model = vosk.Model(VOSK_MODEL_PATH)
+    return _vosk_model
+
+
+# ================== CALIBRATION ==================
+def calibrate(source, force: bool = False):
+    """Adjust the energy threshold to room noise, at most once per TTL."""
+    global _calibrated_at
+    if not force and time.time() - _calibrated_at < CALIBRATION_TTL_SEC:
+        return
+    recognizer.adjust_for_ambient_noise(source, duration=CALIBRATION_DURATION)
+    _calibrated_at = time.time()
+    print(f"[STT] Calibrated energy threshold: {recognizer.energy_threshold:.0f}")
+
+
+# ================== RAW PCM STREAMS ==================
+class PcmStream:
+    """
+    Incremental recognizer for 16-bit mono PCM frames.
+    feed() as audio arrives, finish() for the final text. With vosk the
+    decoding happens inside feed() (partials via on_partial); with google
+    the audio is buffered and sent in one request on finish().
+    """
+
+    def __init__(self, sample_rate: int, language: str = LANGUAGE, on_partial=None):
+        self.sample_rate = sample_rate
+        self.language = language
+        self.on_partial = on_partial
+        self.backend = backend_name()
+        self._chunks = []
+        self._last_partial = ""
+        self._rec = None
+        if self.backend == "vosk":
+            import vosk
+
+            self._rec = vosk.KaldiRecognizer(_get_vosk_model(), sample_rate)
+
+    def feed(self, pcm: bytes):
+        if self._rec is None:
+            self._chunks.append(pcm)
+            return
+        if self._rec.AcceptWaveform(pcm):
+            text = json.loads(self._rec.Result()).get("text", "")
+            if text:
+                self._chunks.append(text)
+        else:
+            partial = json.loads(self._rec.PartialResult()).get("partial", "")
+            if partial and partial != self._last_partial:
+                self._last_partial = partial
+                if self.on_partial:
+                    self.on_partial(" ".join(self._chunks + [partial]))
+
+    def finish(self) -> str:
+        try:
+            if self._rec is not None:
+                tail = json.loads(self._rec.FinalResult()).get("text", "")
+                text = " ".join(self._chunks + ([tail] if tail else []))
+            else:
+                if not self._chunks:
+                    return ""
+                audio = sr.AudioData(b"".join(self._chunks), self.sample_rate, 2)
+                text = recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return ""
+        except Exception as e:
+            print("Speech recognition error:", e)
+            return ""
+        return (text or "").lower().strip()
+
+
+# ================== PUBLIC API ==================
+def listen(timeout=6, phrase_time_limit=15, language: str = LANGUAGE, on_partial=None) -> str:
+    """
+    Record one spoken command from the microphone and return it as
+    lower-case text ("" if nothing was understood).
+    The VAD endpointer decides when the user has finished speaking;
+    phrase_time_limit is only a safety cap.
+    on_partial(text) is called with partial transcripts while the user is
+    still speaking (streaming backends only) for early intent routing.
+    """
+    try:
+        with sr.Microphone(sample_rate=MIC_SAMPLE_RATE, chunk_size=MIC_CHUNK) as source:
+            calibrate(source)
+            endpointer = vad.Endpointer(
+                MIC_SAMPLE_RATE,
+                timeout=timeout,
+                phrase_time_limit=phrase_time_limit,
+                energy_threshold=recognizer.energy_threshold,
+            )
+            stream = PcmStream(MIC_SAMPLE_RATE, language=language, on_partial=on_partial)
+            print("Listening...")
+            while not endpointer.finished:
+                pcm = source.stream.read(MIC_CHUNK)
+                for chunk in endpointer.feed(pcm):
+                    stream.feed(chunk)
+    except Exception as e:
+        print("Listen error:", e)
+        return ""
+
+    if not endpointer.started:
+        return ""
+    return stream.finish()
@@ -0,0 +1,159 @@
+# telemetry.py
+# Background system sampler for status, diagnostics and the HUD graphs.
+#
+# One thread samples CPU (total + per core), RAM and battery every
+# SAMPLE_INTERVAL_SEC, and temperature every TEMP_EVERY_N samples (reading
+# it may spawn a process). Samples go into a ring buffer, so handlers read
+# the latest snapshot in O(1) instead of calling psutil themselves - and
+# cpu_percent() is always measured over a real interval instead of
+# returning 0.0 right after start-up.
+
+import os
+import re
+import time
+import shutil
+import subprocess
+import threading
+from collections import deque
+
+import psutil
+
+SAMPLE_INTERVAL_SEC = float(os.getenv("JARVIS_TELEMETRY_SEC", "2"))
+HISTORY_SECONDS = 600  # 10 minutes of samples for /metrics/history
+TEMP_EVERY_N = 15  # temperature every 30s at the default interval
+# Without the sampler, latest() resamples once its snapshot is this old
+STALE_AFTER_SEC = 2 * SAMPLE_INTERVAL_SEC
+
+_history = deque(maxlen=max(1, int(HISTORY_SECONDS / SAMPLE_INTERVAL_SEC)))
+_lock = threading.Lock()
+_stop_event = threading.Event()
+_thread = None
+_last_temp = None
+
+
+# ================== SENSORS ==================
+def read_temperature():
+    """
+    CPU temperature in °C, or None.
+    macOS: 'osx-cpu-temp' (Homebrew). Linux: psutil.sensors_temperatures().
+    """
+    if shutil.which("osx-cpu-temp"):
+        try:
+            out = subprocess.check_output(["osx-cpu-temp"], timeout=3).decode().strip()
+            match = re.search(r"[-\d.]+", out)
+            value = float(match.group()) if match else None
+            # osx-cpu-temp prints 0.0°C when it cannot read the SMC
+            return value if value else None
+        except Exception as e:
+            print("[TELEMETRY] CPU temp error:", e)
+            return None
+
+    try:
+        sensors = psutil.sensors_temperatures()
+    except (AttributeError, OSError):
+        return None
+    for name in ("coretemp", "k10temp", "cpu_thermal", "acpitz"):
+        entries = sensors.get(name)
+        if entries:
+            return float(entries[0].current)
+    for entries in sensors.values():
+        if entries:
+            return float(entries[0].current)
+    return None
+
+
+def _sample(with_temp: bool) -> dict:
+    global _last_temp
+    sample = {"ts": time.time()}
+    try:
+        sample["cpu"] = psutil.cpu_percent(interval=None)
+        sample["per_core"] = psutil.cpu_percent(interval=None, percpu=True)
+    except Exception as e:
+        print("[TELEMETRY] CPU error:", e)
+        sample["cpu"], sample["per_core"] = None, []
+    try:
+        sample["ram"] = psutil.virtual_memory().percent
+    except Exception as e:
+        print("[TELEMETRY] RAM error:", e)
+        sample["ram"] = None
+    try:
+        bat = psutil.sensors_battery()
+    except Exception:
+        bat = None
+    sample["battery"] = bat.percent if bat else None
+    sample["plugged"] = bat.power_plugged if bat else None
+
+    if with_temp:
+        _last_temp = read_temperature()
+    sample["temp"] = _last_temp
+    return sample
+
+
+# ================== SAMPLER ==================
+def _loop():
+    n = 0
+    while not _stop_event.wait(SAMPLE_INTERVAL_SEC):
+        sample = _sample(with_temp=(n % TEMP_EVERY_N == 0))
+        with _lock:
+            _history.append(sample)
+        n += 1
+
+
+def start():
+    """Start the sampler thread (no-op if already running)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop_event.clear()
+    # Prime cpu_percent so the first real sample covers a full interval
+    psutil.cpu_percent(interval=None)
+    psutil.cpu_percent(interval=None, percpu=True)
+    _thread = threading.Thread(target=_loop, daemon=True, name="jarvis-telemetry")
+    _thread.start()
+
+
+def stop(timeout: float = 5.0):
+    global _thread
+    _stop_event.set()
+    if _thread is not None:
+        _thread.join(timeout=timeout)
+    _thread = None
+
+
+# ================== READERS ==================
+def latest() -> dict:
+    """
+    Most recent sample. While the sampler runs this is always its last
+    sample. Without it (CLI-only use, before start()) a sample older than
+    STALE_AFTER_SEC is replaced by a fresh one; the very first one blocks
+    briefly so cpu_percent covers a real interval.
+    """
+    now = time.time()
+    with _lock:
+        last = _history[-1] if _history else None
+    sampler_running = _thread is not None and _thread.is_alive()
+    if last is not None and (sampler_running or now - last["ts"] <= STALE_AFTER_SEC):
+        return dict(last)
+
+    if last is None:
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+        time.sleep(0.2)
+    # Temperature may spawn a process: re-read it at the sampler's pace only
+    with_temp = last is None or now - last["ts"] > SAMPLE_INTERVAL_SEC * TEMP_EVERY_N
+    sample = _sample(with_temp=with_temp)
+    with _lock:
+        if not _history or _history[-1]["ts"] < sample["ts"]:
+            _history.append(sample)
+    return dict(sample)
+
+
+def history(window_sec: float = 300, fields=None) -> list:
+    """Samples from the last window_sec seconds, optionally only some fields."""
+    cutoff = time.time() - window_sec
+    with _lock:
+        samples = [s for s in _history if s["ts"] >= cutoff]
+    if fields:
+        keep = set(fields) | {"ts"}
+        samples = [{k: v for k, v in s.items() if k in keep} for s in samples]
+    return samples
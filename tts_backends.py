@@ -0,0 +1,152 @@
+# tts_backends.py
+# Speech synthesis backends, shared by speech.py (live output) and
+# tts_cache.py (pre-rendered phrases): macOS 'say', espeak on Linux, or a
+# plain file sink when neither is installed. The active backend is picked
+# on first use (SPEECH_BACKEND=auto) and can be switched at runtime.
+
+import os
+import sys
+import time
+import shutil
+import subprocess
+
+VOICE = "Daniel"  # macOS voice name
+
+# auto | say | espeak | file
+SPEECH_BACKEND = os.getenv("SPEECH_BACKEND", "auto")
+ESPEAK_VOICE = os.getenv("ESPEAK_VOICE", "en")
+SPEECH_FILE = os.getenv("SPEECH_FILE", "speech_output.txt")
+
+_backend = None
+
+
+def _start_say(text: str, voice: str):
+    # Use absolute path to 'say' to avoid PATH issues
+    return subprocess.Popen(
+        ["/usr/bin/say", "-v", voice, text],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _render_say(text: str, voice: str, path: str) -> bool:
+    result = subprocess.run(
+        ["/usr/bin/say", "-v", voice, "-o", path, text],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=60,
+    )
+    return result.returncode == 0
+
+
+def _play_afplay(path: str):
+    return subprocess.Popen(
+        ["/usr/bin/afplay", path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _espeak_exe():
+    return shutil.which("espeak-ng") or shutil.which("espeak") or "espeak"
+
+
+def _start_espeak(text: str, voice: str):
+    return subprocess.Popen(
+        [_espeak_exe(), "-v", ESPEAK_VOICE, text],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _render_espeak(text: str, voice: str, path: str) -> bool:
+    result = subprocess.run(
+        [_espeak_exe(), "-v", ESPEAK_VOICE, "-w", path, text],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=60,
+    )
+    return result.returncode == 0
+
+
+def _wav_player():
+    """argv prefix of an installed WAV player, or None."""
+    if shutil.which("aplay"):
+        return ["aplay", "-q"]
+    if shutil.which("paplay"):
+        return ["paplay"]
+    if shutil.which("ffplay"):
+        return ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]
+    return None
+
+
+def _play_wav(path: str):
+    player = _wav_player()
+    if player is None:
+        raise FileNotFoundError("no WAV player installed (aplay / paplay / ffplay)")
+    return subprocess.Popen(player + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _start_file(text: str, voice: str):
+    """Stand-in backend: append utterances to a text file instead of playing audio."""
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    with open(SPEECH_FILE, "a", encoding="utf-8") as f:
+        f.write(f"{stamp} [{voice}] {text}\n")
+    return None
+
+
+# speak:    start live synthesis, returns Popen (or None when already done)
+# render:   write audio for text to a file (None = backend cannot render)
+# play:     start playing a rendered file, returns Popen
+# can_play: whether play() has a player to run on this machine
+BACKENDS = {
+    "say": {"speak": _start_say, "render": _render_say, "play": _play_afplay,
+            "can_play": lambda: os.path.exists("/usr/bin/afplay"), "ext": ".aiff"},
+    "espeak": {"speak": _start_espeak, "render": _render_espeak, "play": _play_wav,
+               "can_play": lambda: _wav_player() is not None, "ext": ".wav"},
+    "file": {"speak": _start_file, "render": None, "play": None,
+             "can_play": lambda: False, "ext": None},
+}
+
+
+def _pick_backend():
+    name = SPEECH_BACKEND
+    if name == "auto":
+        if sys.platform == "darwin" and os.path.exists("/usr/bin/say"):
+            name = "say"
+        elif shutil.which("espeak-ng") or shutil.which("espeak"):
+            name = "espeak"
+        else:
+            name = "file"
+    if name not in BACKENDS:
+        print(f"[SPEECH] Unknown backend '{name}', using file sink.")
+        name = "file"
+    print(f"[SPEECH] Backend: {name}")
+    return name
+
+
+def set_backend(name: str):
+    """Switch backend at runtime (say / espeak / file)."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown speech backend: {name}")
+    _backend = name
+
+
+def backend_name() -> str:
+    """Name of the active backend (picked on first use)."""
+    global _backend
+    if _backend is None:
+        _backend = _pick_backend()
+    return _backend
+
+
+def backend():
+    """Function table of the active backend."""
+    return BACKENDS[backend_name()]
+
+
+def can_play() -> bool:
+    """True if the active backend can play rendered audio files here."""
+    funcs = backend()
+    return funcs["play"] is not None and funcs["can_play"]()
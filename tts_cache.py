@@ -0,0 +1,231 @@
+# tts_cache.py
+# Pre-rendered audio for phrases JARVIS says over and over.
+# Files are keyed by backend + voice + text hash, so a phrase is synthesized
+# once and afterwards played straight from disk. The cache is pre-warmed at
+# startup with PREWARM_PHRASES, and any short phrase spoken a second time is
+# rendered in the background. Least recently used files are evicted once the
+# folder grows past TTS_CACHE_MAX_MB.
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+import tts_backends
+
+CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "50")) * 1024 * 1024)
+INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
+
+# Phrases longer than this are never cached (they are not "fixed strings")
+MAX_PHRASE_CHARS = 200
+# Render a phrase after it has been spoken this many times
+RENDER_AFTER_USES = 2
+
+PREWARM_PHRASES = [
+    "JARVIS system initializing. Welcome back, sir. You can ask me anything.",
+    "JARVIS system online. Welcome back, sir. Say Jarvis, then your command.",
+    "Stored in my memory.",
+    "I am awake sir.",
+    "Entering sleep mode. Say Jarvis wake up.",
+    "I am currently in sleep mode. Say Jarvis wake up.",
+    "Intruder detected, sir. Triggering red alert protocol.",
+    "Red alert protocol activated, sir.",
+    "Standing down from red alert, sir.",
+    "Yes sir?",
+    "Okay, sir.",
+    "Shutting down, sir.",
+]
+
+# Spoken as the start of longer messages; played from cache, rest synthesized
+PREFIX_PHRASES = [
+    "Reminder, sir:",
+]
+
+_lock = threading.Lock()
+_index = None  # key -> {"file", "text", "voice", "size", "last_used"}
+_uses = {}  # key -> times spoken without a cached file
+_rendering = set()
+
+
+def _key(text: str, voice: str) -> str:
+    raw = f"{tts_backends.backend_name()}|{voice}|{' '.join(text.split())}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _load_index():
+    global _index
+    if _index is not None:
+        return _index
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _index = {}
+    if os.path.exists(INDEX_FILE):
+        try:
+            with open(INDEX_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Keep only entries whose audio file is still there
+            for key, entry in data.items():
+                if os.path.exists(os.path.join(CACHE_DIR, entry.get("file", ""))):
+                    _index[key] = entry
+        except Exception as e:
+            print("[TTS CACHE] Failed to load index:", e)
+    return _index
+
+
+def _save_index():
+    try:
+        with open(INDEX_FILE, "w", encoding="utf-8") as f:
+            json.dump(_index, f)
+    except Exception as e:
+        print("[TTS CACHE] Failed to save index:", e)
+
+
+def _evict_locked():
+    """Drop least recently used files until the cache fits in MAX_BYTES."""
+    total = sum(e.get("size", 0) for e in _index.values())
+    if total <= MAX_BYTES:
+        return
+    for key, entry in sorted(_index.items(), key=lambda kv: kv[1].get("last_used", 0)):
+        try:
+            os.remove(os.path.join(CACHE_DIR, entry["file"]))
+        except OSError:
+            pass
+        total -= entry.get("size", 0)
+        del _index[key]
+        print("[TTS CACHE] Evicted:", entry.get("text", key)[:40])
+        if total <= MAX_BYTES:
+            break
+
+
+def render(text: str, voice: str = None):
+    """Synthesize text to a cached audio file now. Returns the path or None."""
+    voice = voice or tts_backends.VOICE
+    funcs = tts_backends.backend()
+    if funcs["render"] is None or not text:
+        return None
+
+    key = _key(text, voice)
+    with _lock:
+        index = _load_index()
+        entry = index.get(key)
+        if entry:
+            return os.path.join(CACHE_DIR, entry["file"])
+
+    filename = key + funcs["ext"]
+    path = os.path.join(CACHE_DIR, filename)
+    tmp_path = os.path.join(CACHE_DIR, "tmp_" + filename)
+    try:
+        if not funcs["render"](text, voice, tmp_path):
+            print("[TTS CACHE] Render failed:", text[:40])
+            return None
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print("[TTS CACHE] Render error:", e)
+        return None
+
+    with _lock:
+        _index[key] = {
+            "file": filename,
+            "text": text,
+            "voice": voice,
+            "size": os.path.getsize(path),
+            "last_used": time.time(),
+        }
+        _uses.pop(key, None)
+        _evict_locked()
+        _save_index()
+    return path
+
+
+def _render_in_background(text: str, voice: str, key: str):
+    with _lock:
+        if key in _rendering:
+            return
+        _rendering.add(key)
+
+    def job():
+        try:
+            render(text, voice)
+        finally:
+            with _lock:
+                _rendering.discard(key)
+
+    threading.Thread(target=job, daemon=True).start()
+
+
+def lookup(text: str, voice: str = None):
+    """
+    Path of pre-rendered audio for text, or None.
+    A miss on a short phrase is counted; once it recurs it gets rendered
+    in the background so the next time plays from disk.
+    """
+    voice = voice or tts_backends.VOICE
+    if not text or len(text) > MAX_PHRASE_CHARS:
+        return None
+
+    key = _key(text, voice)
+    with _lock:
+        index = _load_index()
+        entry = index.get(key)
+        if entry:
+            entry["last_used"] = time.time()
+            return os.path.join(CACHE_DIR, entry["file"])
+        _uses[key] = _uses.get(key, 0) + 1
+        due = _uses[key] >= RENDER_AFTER_USES
+
+    if due:
+        _render_in_background(text, voice, key)
+    return None
+
+
+def lookup_prefix(text: str, voice: str = None):
+    """
+    If text starts with one of PREFIX_PHRASES that is rendered, return
+    (prefix_audio_path, remaining_text); otherwise (None, text).
+    """
+    voice = voice or tts_backends.VOICE
+    for prefix in PREFIX_PHRASES:
+        if text.startswith(prefix) and len(text) > len(prefix):
+            path = lookup(prefix, voice)
+            if path:
+                return path, text[len(prefix):].strip()
+    return None, text
+
+
+def path_for_key(key: str):
+    """Cached audio file for a key (used by the HUD /tts route)."""
+    with _lock:
+        entry = _load_index().get(key)
+        if not entry:
+            return None
+        entry["last_used"] = time.time()
+        return os.path.join(CACHE_DIR, entry["file"])
+
+
+def key_for_text(text: str, voice: str = None):
+    """Key of a cached phrase, or None if it has not been rendered."""
+    key = _key(text, voice or tts_backends.VOICE)
+    with _lock:
+        return key if key in _load_index() else None
+
+
+def prewarm(phrases=None):
+    """Render the configured phrase list (skips phrases already cached)."""
+    if tts_backends.backend()["render"] is None:
+        return 0
+    count = 0
+    for phrase in phrases or (PREWARM_PHRASES + PREFIX_PHRASES):
+        if render(phrase):
+            count += 1
+    print(f"[TTS CACHE] Pre-warmed {count} phrases.")
+    with _lock:
+        _save_index()
+    return count
+
+
+def prewarm_async(phrases=None):
+    """Pre-warm in a background thread so startup is not delayed."""
+    t = threading.Thread(target=prewarm, args=(phrases,), daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,172 @@
+# user_profile.py
+# Name + favourites learned from conversation ("my favourite game is gta 5")
+# and answered back ("what is my favourite games").
+#
+# Favourites are stored and read back the way the user said them ("my
+# favourite smoothies are ..."); lookups go through a normalized index key
+# (lowercase, no articles / punctuation, plurals folded), so "games", "the
+# game" and "Game" find the same entry. A query with no exact key falls
+# back to a trigram index, but only for words of MIN_FUZZY_LEN letters or
+# more and one wrong letter at most ("footbal" finds "football"; "tea" does
+# not find "team"). Learning and queries are each recognized by one
+# precompiled pattern, and commands without "my" / "about me" skip both
+# without running any regex.
+
+import re
+
+import app_index  # trigram / edit-distance helpers shared with app lookup
+
+ARTICLES = {"a", "an", "the", "my"}
+# Words the suffix rules get wrong, and British -> American spellings
+IRREGULAR = {
+    "news": "news", "series": "series", "people": "person",
+    "colour": "color", "colours": "color", "flavour": "flavor", "flavours": "flavor",
+}
+MIN_FUZZY_LEN = 5  # shorter keys only match exactly
+MAX_FUZZY_EDITS = 1
+
+LEARN_RE = re.compile(r"\bmy (?:name is (?P<name>.+)|favou?rite (?P<attr>.+?) (?:is|are) (?P<value>.+))")
+QUERY_RE = re.compile(
+    r"\bwhat(?:'s| is| are) my (?:(?P<name>name)\b|favou?rites? ?(?P<attr>.*))"
+    r"|\bwhat do you know about me\b"
+)
+
+_index_keys = None  # stored keys the index was built from
+_norm = {}  # normalized key -> stored key
+_trigrams = {}  # trigram -> set of normalized keys
+
+
+def _singular(word: str) -> str:
+    """Index form of a word; only ever compared, never shown to the user."""
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith(("ches", "shes", "xes", "zes", "sses")):
+        return word[:-2]
+    if word.endswith("s"):
+        word = word[:-1]
+    # hobby / hobbies -> hobbie, smoothie / smoothies -> smoothie
+    if word.endswith("y") and len(word) > 2 and word[-2] not in "aeiou":
+        word = word[:-1] + "ie"
+    return word
+
+
+def normalize_key(attr: str) -> str:
+    words = re.sub(r"[^\w\s]", " ", (attr or "").lower()).split()
+    words = [w for w in words if w not in ARTICLES]
+    return " ".join(_singular(w) for w in words)
+
+
+def _verb(attr: str) -> str:
+    """'are' for an attribute said in the plural ("smoothies"), else 'is'."""
+    last = attr.split()[-1] if attr.split() else ""
+    return "are" if last.endswith("s") and _singular(last) != last else "is"
+
+
+def _ensure_index(favorites: dict):
+    """Rebuild the key index when the stored favourites changed."""
+    global _index_keys, _norm, _trigrams
+    keys = tuple(favorites)
+    if keys == _index_keys:
+        return
+    norm, trigrams = {}, {}
+    for key in keys:
+        nk = normalize_key(key)
+        norm[nk] = key
+        for g in app_index._grams(nk):
+            trigrams.setdefault(g, set()).add(nk)
+    _index_keys, _norm, _trigrams = keys, norm, trigrams
+
+
+def find_favorite(favorites: dict, attr: str):
+    """Stored key matching attr (exact after normalizing, else fuzzy), or None."""
+    _ensure_index(favorites)
+    query = normalize_key(attr)
+    if not query:
+        return None
+    if query in _norm:
+        return _norm[query]
+    if len(query) < MIN_FUZZY_LEN:
+        return None
+    candidates = set()
+    for g in app_index._grams(query):
+        candidates |= _trigrams.get(g, set())
+    # Candidates share at least one trigram; closest one within one edit
+    best, best_dist = None, MAX_FUZZY_EDITS + 1
+    for nk in candidates:
+        if len(nk) < MIN_FUZZY_LEN:
+            continue
+        dist = app_index.edit_distance(query, nk)
+        if dist < best_dist:
+            best, best_dist = nk, dist
+    return _norm[best] if best is not None else None
+
+
+# ================== LEARNING ==================
+def learn(text: str, memory: dict):
+    """
+    Learn from sentences like "my name is raj" / "my favourite game is gta 5".
+    Returns the reply (memory changed, caller saves) or None.
+    """
+    if "my " not in text:
+        return None
+    match = LEARN_RE.search(text)
+    if not match:
+        return None
+
+    if match.group("name") is not None:
+        name = match.group("name").strip()
+        if not name:
+            return None
+        memory.setdefault("profile", {})["name"] = name
+        return f"Nice to meet you, {name}."
+
+    attr = match.group("attr").strip()
+    value = match.group("value").strip()
+    if not normalize_key(attr) or not value:
+        return None
+    favorites = memory.setdefault("favorites", {})
+    # Replace an older spelling of the same key ("game" -> "games")
+    key = normalize_key(attr)
+    for old in [k for k in favorites if normalize_key(k) == key]:
+        del favorites[old]
+    favorites[attr] = value
+    return f"I will remember your favourite {attr} {_verb(attr)} {value}."
+
+
+# ================== QUERIES ==================
+def answer(text: str, memory: dict):
+    """Reply to a name / favourite / "what do you know about me" question, or None."""
+    if "my " not in text and "about me" not in text:
+        return None
+    match = QUERY_RE.search(text)
+    if not match:
+        return None
+    prof = memory.get("profile", {})
+    favs = memory.get("favorites", {})
+
+    if match.group("name"):
+        name = prof.get("name")
+        return f"Your name is {name}." if name else "You have not told me your name yet."
+
+    if match.group("attr") is not None:
+        attr = match.group("attr").strip(" ?.")
+        if not attr:
+            return "Which favourite are you asking about, sir?"
+        key = find_favorite(favs, attr)
+        if key is None:
+            return "You did not tell me that yet."
+        return f"Your favourite {key} {_verb(key)} {favs[key]}."
+
+    bits = []
+    if prof.get("name"):
+        bits.append(f"your name is {prof['name']}")
+    for k, v in favs.items():
+        bits.append(f"your favourite {k} {_verb(k)} {v}")
+    notes = memory.get("notes", [])
+    if notes:
+        bits.append("you told me: " + "; ".join(notes[:3]))
+    if not bits:
+        return "I do not know much yet, sir."
+    return "Here is what I know about you: " + "; ".join(bits)
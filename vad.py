@@ -0,0 +1,193 @@
+# vad.py
+# Voice activity detection endpointing for command capture.
+#
+# Audio is cut into 30ms frames and each frame is classified as speech or
+# silence (WebRTC VAD when the 'webrtcvad' package is installed, otherwise an
+# energy threshold). Capture starts once most of the recent frames are speech
+# and ends after VAD_TRAILING_SILENCE_MS of silence, so "what time" finishes
+# right away and long commands are not cut at a fixed limit.
+#
+# mark_dispatch() measures the time from the user's last spoken frame to
+# the moment the command is handed to Jarvis (end-of-speech → dispatch).
+# The wake word listener runs in its own process and sends its measurement
+# along with the command; the server records it with record_latency(), and
+# latency_stats() is served at /metrics/voice.
+
+import os
+import time
+import array
+from collections import deque
+
+try:
+    import webrtcvad
+except ImportError:  # optional dependency
+    webrtcvad = None
+
+FRAME_MS = 30  # WebRTC VAD accepts 10, 20 or 30ms frames
+TRAILING_SILENCE_MS = int(os.getenv("VAD_TRAILING_SILENCE_MS", "500"))
+AGGRESSIVENESS = int(os.getenv("VAD_AGGRESSIVENESS", "2"))  # 0 (lenient) .. 3 (strict)
+
+# Speech starts when START_RATIO of the last START_WINDOW frames are voiced
+START_WINDOW = 8
+START_RATIO = 0.6
+PRE_ROLL_MS = 300  # audio kept from before the start trigger
+
+MIN_SPEECH_ENERGY = 300  # energy fallback threshold (RMS)
+WEBRTC_RATES = (8000, 16000, 32000, 48000)
+
+# Recent end-of-speech → dispatch latencies in seconds
+LATENCY_HISTORY = 50
+_latencies = deque(maxlen=LATENCY_HISTORY)
+_last_endpoint = {"speech_end": None, "decided": None}
+
+
+def rms(pcm: bytes) -> float:
+    """Root mean square energy of 16-bit mono PCM."""
+    samples = array.array("h", pcm)
+    if not samples:
+        return 0.0
+    return (sum(s * s for s in samples) / len(samples)) ** 0.5
+
+
+class Endpointer:
+    """
+    Streaming speech endpointer.
+    feed() raw 16-bit mono PCM of any length; it returns the audio chunks that
+    belong to the command (pre-roll included) so they can go straight to a
+    recognizer. Check `finished` after each call.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        timeout: float = 6,
+        phrase_time_limit: float = 15,
+        trailing_silence_ms: int = None,
+        energy_threshold: float = None,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * FRAME_MS / 1000) * 2
+        self.timeout_ms = (timeout or 0) * 1000
+        self.limit_ms = (phrase_time_limit or 0) * 1000
+        self.trailing_ms = TRAILING_SILENCE_MS if trailing_silence_ms is None else trailing_silence_ms
+        self.energy_threshold = max(MIN_SPEECH_ENERGY, energy_threshold or 0)
+
+        self._vad = None
+        if webrtcvad is not None and sample_rate in WEBRTC_RATES:
+            self._vad = webrtcvad.Vad(AGGRESSIVENESS)
+
+        self._pending = b""
+        self._window = deque(maxlen=START_WINDOW)
+        self._pre_roll = deque(maxlen=max(1, PRE_ROLL_MS // FRAME_MS))
+        self._waited_ms = 0
+        self._speech_ms = 0
+        self._silence_ms = 0
+
+        self.started = False
+        self.finished = False
+        self.timed_out = False
+        self.speech_end_time = None  # wall clock of the last voiced frame
+        self.decided_time = None  # wall clock when the endpoint was detected
+
+    def is_speech(self, frame: bytes) -> bool:
+        if self._vad is not None:
+            try:
+                return self._vad.is_speech(frame, self.sample_rate)
+            except Exception:
+                pass
+        return rms(frame) >= self.energy_threshold
+
+    def _finish(self, timed_out: bool = False):
+        self.finished = True
+        self.timed_out = timed_out
+        self.decided_time = time.time()
+        if self.started:
+            _last_endpoint["speech_end"] = self.speech_end_time
+            _last_endpoint["decided"] = self.decided_time
+
+    def feed(self, pcm: bytes):
+        if self.finished:
+            return []
+        out = []
+        self._pending += pcm
+        while len(self._pending) >= self.frame_bytes and not self.finished:
+            frame = self._pending[: self.frame_bytes]
+            self._pending = self._pending[self.frame_bytes:]
+            voiced = self.is_speech(frame)
+
+            if not self.started:
+                self._waited_ms += FRAME_MS
+                self._window.append(voiced)
+                self._pre_roll.append(frame)
+                if voiced and sum(self._window) >= START_RATIO * START_WINDOW:
+                    self.started = True
+                    self.speech_end_time = time.time()
+                    out.extend(self._pre_roll)
+                    self._pre_roll.clear()
+                    self._speech_ms = len(out) * FRAME_MS
+                elif self.timeout_ms and self._waited_ms >= self.timeout_ms:
+                    self._finish(timed_out=True)
+                continue
+
+            out.append(frame)
+            self._speech_ms += FRAME_MS
+            if voiced:
+                self._silence_ms = 0
+                self.speech_end_time = time.time()
+            else:
+                self._silence_ms += FRAME_MS
+
+            if self._silence_ms >= self.trailing_ms:
+                self._finish()
+            elif self.limit_ms and self._speech_ms >= self.limit_ms:
+                self._finish()
+        return out
+
+
+# ================== LATENCY REPORTING ==================
+def mark_dispatch(label: str = "command"):
+    """
+    Call right before a recognized command is dispatched. Prints and records
+    the time since the user stopped speaking. Returns seconds or None.
+    """
+    speech_end = _last_endpoint["speech_end"]
+    decided = _last_endpoint["decided"]
+    if speech_end is None:
+        return None
+    now = time.time()
+    total = now - speech_end
+    record_latency(total)
+    _last_endpoint["speech_end"] = None
+    print(
+        f"[VAD] {label}: end of speech → dispatch {total * 1000:.0f} ms "
+        f"(endpoint {(decided - speech_end) * 1000:.0f} ms, "
+        f"recognition {(now - decided) * 1000:.0f} ms)"
+    )
+    return total
+
+
+def record_latency(seconds):
+    """Add an end-of-speech → dispatch latency measured elsewhere (seconds)."""
+    try:
+        seconds = float(seconds)
+    except (TypeError, ValueError):
+        return
+    if seconds >= 0:
+        _latencies.append(seconds)
+
+
+def latency_stats():
+    """p50 / p95 / last end-of-speech → dispatch latency in milliseconds."""
+    if not _latencies:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "last_ms": None}
+    ordered = sorted(_latencies)
+
+    def pct(p):
+        return round(1000 * ordered[min(len(ordered) - 1, int(p * (len(ordered) - 1)))], 1)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "last_ms": round(1000 * _latencies[-1], 1),
+    }
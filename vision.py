@@ -3,19 +3,154 @@ import numpy as np
 import mediapipe as mp
 import os
 import time
+from contextlib import contextmanager
 
 # Simple local face & hand utilities using only OpenCV + MediaPipe.
 # This is not perfect "real" face-recognition but works as a fun prototype.
+# Set VISION_FRAME_SOURCE (image folder or video file) to run without a webcam.
 
 FACE_DIR = "faces"
 os.makedirs(FACE_DIR, exist_ok=True)
 
+# Face detection runs on a downscaled copy of the frame (this width in pixels),
+# boxes are mapped back to full resolution afterwards. 0 disables downscaling.
+DETECT_WIDTH = int(os.getenv("VISION_DETECT_WIDTH", "320"))
+# For frame streams: run the full cascade every N frames, track in between.
+DETECT_EVERY_N = int(os.getenv("VISION_DETECT_EVERY_N", "5"))
+# Template-match score below which the tracker gives up and re-detects.
+TRACK_MIN_SCORE = 0.6
+
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
+_face_cascade = None
+
+# Per-stage timings (name -> list of seconds). None = timing disabled.
+_stage_timings = None
+
+# Tracker state for track_faces()
+_track_state = {"box": None, "template": None, "frames_since_detect": 0}
+
+# Optional replay source that stands in for the webcam (directory of images
+# or a video file). Lets benchmarks / CI run without a camera.
+FRAME_SOURCE = os.getenv("VISION_FRAME_SOURCE")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+_replay = {"frames": None, "index": 0, "loop": True, "last_name": None}
+
+
+@contextmanager
+def _stage(name: str):
+    """Time one pipeline stage when stage timing is enabled (benchmarks)."""
+    if _stage_timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stage_timings.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def start_stage_timing():
+    """Start collecting per-stage latencies (used by vision_benchmark.py)."""
+    global _stage_timings
+    _stage_timings = {}
+
+
+def stop_stage_timing():
+    """Stop collecting and return {stage: [seconds, ...]}."""
+    global _stage_timings
+    timings = _stage_timings or {}
+    _stage_timings = None
+    return timings
+
+
+def load_frames(source: str, max_frames: int = 0):
+    """
+    Load frames from a directory of images (sorted by file name) or a video file.
+    Returns a list of (name, frame) where name is the image file name or the
+    zero-based frame index as a string for videos.
+    """
+    frames = []
+    if os.path.isdir(source):
+        names = sorted(f for f in os.listdir(source) if f.lower().endswith(IMAGE_EXTS))
+        for name in names:
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is None:
+                print("[vision] Could not read replay image:", name)
+                continue
+            frames.append((name, frame))
+            if max_frames and len(frames) >= max_frames:
+                break
+        return frames
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print("[vision] Cannot open replay video:", source)
+        return frames
+    index = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            break
+        frames.append((str(index), frame))
+        index += 1
+        if max_frames and len(frames) >= max_frames:
+            break
+    cap.release()
+    return frames
+
+
+def set_frame_source(source=None, loop: bool = True, max_frames: int = 0) -> bool:
+    """
+    Replace the webcam with recorded frames.
+    source: directory of images, video file path, a list of (name, frame)
+            tuples, or None to go back to the real webcam.
+    loop:   start again from the first frame when the source runs out.
+    """
+    if source is None:
+        _replay["frames"] = None
+        _replay["index"] = 0
+        _replay["last_name"] = None
+        return True
+
+    frames = source if isinstance(source, list) else load_frames(source, max_frames)
+    if not frames:
+        print("[vision] Replay source has no frames:", source)
+        return False
+
+    _replay["frames"] = frames
+    _replay["index"] = 0
+    _replay["loop"] = loop
+    _replay["last_name"] = None
+    print(f"[vision] Using replay frame source ({len(frames)} frames).")
+    return True
+
+
+def last_frame_name():
+    """Name of the replay frame served most recently (None for the webcam)."""
+    return _replay["last_name"]
+
+
+def _next_replay_frame():
+    frames = _replay["frames"]
+    if _replay["index"] >= len(frames):
+        if not _replay["loop"]:
+            return None
+        _replay["index"] = 0
+    name, frame = frames[_replay["index"]]
+    _replay["index"] += 1
+    _replay["last_name"] = name
+    return frame.copy()
+
 
 def _capture_frame_from_camera(timeout_sec: float = 5.0):
     """Capture a single frame from default webcam. Returns frame (BGR) or None."""
+    if _replay["frames"] is not None:
+        with _stage("capture"):
+            return _next_replay_frame()
+
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         print("[vision] Cannot access webcam.")
@@ -38,7 +173,11 @@ def _capture_frame_from_camera(timeout_sec: float = 5.0):
 
 
 def _load_face_cascade():
-    """Load Haar cascade for face detection."""
+    """Load Haar cascade for face detection (loaded once, then reused)."""
+    global _face_cascade
+    if _face_cascade is not None:
+        return _face_cascade
+
     cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
     if not os.path.exists(cascade_path):
         print("[vision] Haar cascade not found at:", cascade_path)
@@ -48,28 +187,160 @@ def _load_face_cascade():
     if face_cascade.empty():
         print("[vision] Failed to load Haar cascade.")
         return None
+    _face_cascade = face_cascade
     return face_cascade
 
 
+def _to_gray(frame):
+    with _stage("grayscale"):
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def _downscale(gray, detect_width: int = None):
+    """
+    Shrink a grayscale frame to detect_width pixels wide.
+    Returns (small_image, scale) where scale = small / full.
+    """
+    if detect_width is None:
+        detect_width = DETECT_WIDTH
+    h, w = gray.shape[:2]
+    if not detect_width or w <= detect_width:
+        return gray, 1.0
+    with _stage("downscale"):
+        scale = detect_width / float(w)
+        small = cv2.resize(gray, (detect_width, max(1, int(round(h * scale)))), interpolation=cv2.INTER_AREA)
+    return small, scale
+
+
+def _map_box(box, scale: float):
+    """Map an (x, y, w, h) box from downscaled to full-resolution coordinates."""
+    x, y, w, h = box
+    if scale == 1.0:
+        return int(x), int(y), int(w), int(h)
+    return int(x / scale), int(y / scale), int(w / scale), int(h / scale)
+
+
+def _detect_faces(frame, detect_width: int = None):
+    """
+    Run the Haar cascade on a downscaled grayscale copy of the frame.
+    Returns a list of (x, y, w, h) boxes in full-resolution coordinates.
+    """
+    face_cascade = _load_face_cascade()
+    if face_cascade is None:
+        return []
+
+    gray = _to_gray(frame)
+    small, scale = _downscale(gray, detect_width)
+    with _stage("detect"):
+        faces = face_cascade.detectMultiScale(small, 1.3, 5)
+    return [_map_box(box, scale) for box in faces]
+
+
+def _largest_box(boxes):
+    return max(boxes, key=lambda box: box[2] * box[3])
+
+
+def reset_tracker():
+    """Forget the tracked face so the next frame runs a full detection."""
+    _track_state["box"] = None
+    _track_state["template"] = None
+    _track_state["frames_since_detect"] = 0
+
+
+def _track_template(small, scale: float):
+    """
+    Look for the last face template in a window around its previous position.
+    Works on the downscaled frame. Returns a full-res box or None if lost.
+    """
+    template = _track_state["template"]
+    box = _track_state["box"]
+    if template is None or box is None:
+        return None
+
+    with _stage("track"):
+        # Previous box in downscaled coordinates, search window = box grown by 50%
+        x, y, w, h = [int(round(v * scale)) for v in box]
+        th, tw = template.shape[:2]
+        pad_x, pad_y = max(tw // 2, 4), max(th // 2, 4)
+        sh, sw = small.shape[:2]
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1, y1 = min(sw, x + w + pad_x), min(sh, y + h + pad_y)
+        window = small[y0:y1, x0:x1]
+        if window.shape[0] < th or window.shape[1] < tw:
+            return None
+
+        result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < TRACK_MIN_SCORE:
+            return None
+
+        nx, ny = x0 + max_loc[0], y0 + max_loc[1]
+        _track_state["template"] = small[ny:ny + th, nx:nx + tw].copy()
+        return _map_box((nx, ny, tw, th), scale)
+
+
+def track_faces(frame, detect_every: int = None, detect_width: int = None):
+    """
+    Face boxes for consecutive frames of a stream (video / camera loop).
+    Full cascade detection runs every `detect_every` frames; in between the
+    last face is followed with a cheap template match. If tracking loses the
+    face, detection runs again immediately.
+    Returns a list of (x, y, w, h) boxes in full-resolution coordinates.
+    """
+    if detect_every is None:
+        detect_every = DETECT_EVERY_N
+
+    gray = _to_gray(frame)
+    small, scale = _downscale(gray, detect_width)
+
+    due = (
+        _track_state["box"] is None
+        or _track_state["frames_since_detect"] >= max(1, detect_every) - 1
+    )
+    if not due:
+        box = _track_template(small, scale)
+        if box is not None:
+            _track_state["box"] = box
+            _track_state["frames_since_detect"] += 1
+            return [box]
+
+    face_cascade = _load_face_cascade()
+    if face_cascade is None:
+        return []
+    with _stage("detect"):
+        faces = face_cascade.detectMultiScale(small, 1.3, 5)
+
+    _track_state["frames_since_detect"] = 0
+    if len(faces) == 0:
+        _track_state["box"] = None
+        _track_state["template"] = None
+        return []
+
+    sx, sy, sw, sh = [int(v) for v in _largest_box(faces)]
+    _track_state["template"] = small[sy:sy + sh, sx:sx + sw].copy()
+    _track_state["box"] = _map_box((sx, sy, sw, sh), scale)
+    return [_map_box(box, scale) for box in faces]
+
+
 def _crop_face(frame):
     """
     Detect the largest face in the frame and return the cropped region.
     If no face is found, return the original frame.
     """
-    face_cascade = _load_face_cascade()
-    if face_cascade is None:
+    if _load_face_cascade() is None:
         print("[vision] No cascade, returning full frame for face.")
         return frame
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+    faces = _detect_faces(frame)
 
     if len(faces) == 0:
         print("[vision] No face found to crop, using full frame.")
         return frame
 
     # pick the largest face (by area)
-    x, y, w, h = max(faces, key=lambda box: box[2] * box[3])
+    x, y, w, h = _largest_box(faces)
     face_roi = frame[y:y+h, x:x+w]
     print(f"[vision] Cropped face region: x={x}, y={y}, w={w}, h={h}")
     return face_roi
@@ -123,14 +394,16 @@ def recognize_face(name: str = "owner", threshold: float = 20000.0):
 
     try:
         # Crop faces in both images
-        ref_face = _crop_face(ref_img)
-        cur_face = _crop_face(frame)
+        with _stage("crop"):
+            ref_face = _crop_face(ref_img)
+            cur_face = _crop_face(frame)
 
-        ref_gray = cv2.cvtColor(cv2.resize(ref_face, (200, 200)), cv2.COLOR_BGR2GRAY)
-        cur_gray = cv2.cvtColor(cv2.resize(cur_face, (200, 200)), cv2.COLOR_BGR2GRAY)
+        with _stage("compare"):
+            ref_gray = cv2.cvtColor(cv2.resize(ref_face, (200, 200)), cv2.COLOR_BGR2GRAY)
+            cur_gray = cv2.cvtColor(cv2.resize(cur_face, (200, 200)), cv2.COLOR_BGR2GRAY)
 
-        # Compute simple L2 distance
-        diff = cv2.norm(ref_gray, cur_gray, cv2.NORM_L2)
+            # Compute simple L2 distance
+            diff = cv2.norm(ref_gray, cur_gray, cv2.NORM_L2)
         print(f"[vision] Face diff score: {diff}")
 
         is_same = diff < threshold
@@ -163,7 +436,8 @@ def detect_hand_gesture():
 
             image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             try:
-                results = hands.process(image_rgb)
+                with _stage("hands"):
+                    results = hands.process(image_rgb)
             except Exception as e:
                 print("[vision] Error in hand detection:", e)
                 return "unknown"
@@ -207,8 +481,7 @@ def see_any_person():
     Use a basic Haar cascade to check whether a face is visible.
     Returns True if at least one face is detected.
     """
-    face_cascade = _load_face_cascade()
-    if face_cascade is None:
+    if _load_face_cascade() is None:
         return False
 
     frame = _capture_frame_from_camera()
@@ -217,10 +490,13 @@ def see_any_person():
         return False
 
     try:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+        faces = _detect_faces(frame)
         print(f"[vision] Faces detected: {len(faces)}")
         return len(faces) > 0
     except Exception as e:
         print("[vision] Error in face detection:", e)
         return False
+
+
+if FRAME_SOURCE:
+    set_frame_source(FRAME_SOURCE)
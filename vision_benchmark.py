@@ -0,0 +1,206 @@
+# vision_benchmark.py
+# Measure vision.py speed and accuracy on recorded frames (no webcam needed).
+#
+# Detection speed on video clips:
+#   python vision_benchmark.py detect clip1.mp4 [clip2.mp4 ...] [--every 5] [--width 320]
+#   - baseline: full-resolution detectMultiScale on every frame (old behaviour)
+#   - pipeline: vision.track_faces (downscaled detection + ROI tracking)
+#
+# End-to-end suite on a folder of images or a video file:
+#   python vision_benchmark.py suite frames/ --labels labels.json [--face-name raj]
+#   Times recognize_face, see_any_person and detect_hand_gesture per frame
+#   (end to end + per stage, p50/p95) and scores them against labels.
+#
+# labels.json maps frame names (image file name, or frame index for videos) to
+# the expected results; every key is optional:
+#   {"0001.jpg": {"person": true, "owner": true, "gesture": "open_palm"}}
+
+import argparse
+import json
+import os
+import time
+
+import cv2
+
+import vision
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _print_stages(timings, order=None):
+    names = order or sorted(timings)
+    for name in names:
+        values = timings.get(name)
+        if not values:
+            continue
+        p50_ms = 1000.0 * _percentile(values, 50)
+        p95_ms = 1000.0 * _percentile(values, 95)
+        print(f"    {name:<10} n={len(values):<6} p50={p50_ms:8.2f} ms  p95={p95_ms:8.2f} ms")
+
+
+# ================== DETECT: FPS ON VIDEO CLIPS ==================
+def _run_baseline(frames):
+    cascade = vision._load_face_cascade()
+    found = 0
+    start = time.perf_counter()
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = cascade.detectMultiScale(gray, 1.3, 5)
+        if len(faces) > 0:
+            found += 1
+    return time.perf_counter() - start, found
+
+
+def _run_pipeline(frames, every: int, width: int):
+    vision.reset_tracker()
+    vision.start_stage_timing()
+    found = 0
+    start = time.perf_counter()
+    for frame in frames:
+        if vision.track_faces(frame, detect_every=every, detect_width=width):
+            found += 1
+    elapsed = time.perf_counter() - start
+    return elapsed, found, vision.stop_stage_timing()
+
+
+def benchmark_file(path: str, every: int, width: int, max_frames: int = 0):
+    frames = [frame for _, frame in vision.load_frames(path, max_frames)]
+    if not frames:
+        return
+    h, w = frames[0].shape[:2]
+    print(f"\n=== {path} ({len(frames)} frames, {w}x{h}) ===")
+
+    base_time, base_found = _run_baseline(frames)
+    print(
+        f"  baseline : {len(frames) / base_time:8.1f} fps  "
+        f"({1000.0 * base_time / len(frames):.2f} ms/frame, face in {base_found} frames)"
+    )
+
+    pipe_time, pipe_found, timings = _run_pipeline(frames, every, width)
+    print(
+        f"  pipeline : {len(frames) / pipe_time:8.1f} fps  "
+        f"({1000.0 * pipe_time / len(frames):.2f} ms/frame, face in {pipe_found} frames, "
+        f"width={width}, detect every {every})"
+    )
+    _print_stages(timings, ("grayscale", "downscale", "detect", "track"))
+
+
+def run_detect(args):
+    if vision._load_face_cascade() is None:
+        print("[bench] Haar cascade unavailable, aborting.")
+        return
+    for path in args.videos:
+        benchmark_file(path, args.every, args.width, args.max_frames)
+
+
+# ================== SUITE: END-TO-END LATENCY + ACCURACY ==================
+def _load_labels(path):
+    if not path:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print("[bench] Could not read labels:", e)
+        return {}
+
+
+def _timed_call(fn):
+    """Run fn once with stage timing on. Returns (result, total_sec, {stage: sec})."""
+    vision.start_stage_timing()
+    start = time.perf_counter()
+    try:
+        result = fn()
+    finally:
+        total = time.perf_counter() - start
+        stages = vision.stop_stage_timing()
+    return result, total, {name: sum(values) for name, values in stages.items()}
+
+
+def run_suite(args):
+    frames = vision.load_frames(args.source, args.max_frames)
+    if not frames:
+        print("[bench] No frames to replay.")
+        return
+    labels = _load_labels(args.labels)
+
+    checks = {
+        "see_any_person": (lambda: vision.see_any_person(), "person", lambda r: bool(r)),
+        "recognize_face": (lambda: vision.recognize_face(args.face_name), "owner", lambda r: bool(r[0])),
+        "detect_hand_gesture": (lambda: vision.detect_hand_gesture(), "gesture", lambda r: r),
+    }
+    if not os.path.exists(os.path.join(vision.FACE_DIR, f"{args.face_name}.jpg")):
+        print(f"[bench] No stored face for {args.face_name}; skipping recognize_face.")
+        checks.pop("recognize_face")
+    if args.only:
+        wanted = set(args.only.split(","))
+        checks = {k: v for k, v in checks.items() if k in wanted}
+
+    totals = {name: [] for name in checks}
+    stages = {name: {} for name in checks}
+    correct = {name: 0 for name in checks}
+    labelled = {name: 0 for name in checks}
+
+    for frame_name, frame in frames:
+        # Every capture inside the call sees this one frame
+        vision.set_frame_source([(frame_name, frame)], loop=True)
+        expected = labels.get(frame_name, {})
+        for name, (fn, label_key, normalize) in checks.items():
+            result, total, per_stage = _timed_call(fn)
+            totals[name].append(total)
+            for stage, sec in per_stage.items():
+                stages[name].setdefault(stage, []).append(sec)
+            if label_key in expected:
+                labelled[name] += 1
+                if normalize(result) == expected[label_key]:
+                    correct[name] += 1
+
+    vision.set_frame_source(None)
+
+    print(f"\n=== {args.source} ({len(frames)} frames, {len(labels)} labelled) ===")
+    for name in checks:
+        values = totals[name]
+        print(
+            f"\n  {name}: p50={1000.0 * _percentile(values, 50):.2f} ms  "
+            f"p95={1000.0 * _percentile(values, 95):.2f} ms"
+        )
+        _print_stages(stages[name])
+        if labelled[name]:
+            acc = 100.0 * correct[name] / labelled[name]
+            print(f"    accuracy   {correct[name]}/{labelled[name]} = {acc:.1f}%")
+        else:
+            print("    accuracy   n/a (no labels)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JARVIS vision on recorded frames.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    detect = sub.add_parser("detect", help="face detection fps on video files")
+    detect.add_argument("videos", nargs="+", help="recorded video files")
+    detect.add_argument("--every", type=int, default=vision.DETECT_EVERY_N, help="full detection every N frames")
+    detect.add_argument("--width", type=int, default=vision.DETECT_WIDTH, help="detection width in pixels (0 = full)")
+    detect.add_argument("--max-frames", type=int, default=0, help="only use the first N frames of each clip")
+
+    suite = sub.add_parser("suite", help="end-to-end latency and accuracy on labelled frames")
+    suite.add_argument("source", help="folder of images or a video file")
+    suite.add_argument("--labels", help="JSON file with expected results per frame")
+    suite.add_argument("--face-name", default="raj", help="stored face used by recognize_face")
+    suite.add_argument("--only", help="comma separated subset of functions to run")
+    suite.add_argument("--max-frames", type=int, default=0, help="only use the first N frames")
+
+    args = parser.parse_args()
+    if args.mode == "detect":
+        run_detect(args)
+    else:
+        run_suite(args)
+
+
+if __name__ == "__main__":
+    main()
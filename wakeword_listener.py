@@ -2,9 +2,13 @@ import os
 import struct
 
 import pvporcupine
-import pyaudio
 import requests
-import speech_recognition as sr
+from requests.adapters import HTTPAdapter
+
+import audio_pipeline
+import ipc
+import stt
+import vad
 
 # ================== CONFIG ==================
 
@@ -17,40 +21,85 @@ SERVER_URL = "http://127.0.0.1:5001/ask"
 # Keyword file path (jarvis.ppn in your project folder)
 KEYWORD_PATH = "jarvis.ppn"
 
+# How commands reach Jarvis:
+#   auto      - Unix socket if the server exposes one, else HTTP
+#   socket    - local Unix socket (ipc.py), server must run on this machine
+#   http      - POST to SERVER_URL over a pooled keep-alive session
+#   inprocess - import main and call handle_command directly (no server)
+DISPATCH_MODE = os.getenv("JARVIS_DISPATCH", "auto")
+
+# (connect, read) timeouts for HTTP; GPT answers can take a while
+HTTP_TIMEOUT = (2.0, 30.0)
+
+_session = None
+
 
 # ================== HELPERS ==================
 
-def send_to_server(cmd: str):
-    """Send recognized command text to your Flask /ask route."""
+def _get_session():
+    """One keep-alive HTTP session reused for every command."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=1)
+        _session.mount("http://", adapter)
+    return _session
+
+
+def _dispatch_mode() -> str:
+    if DISPATCH_MODE == "auto":
+        return "socket" if ipc.available() else "http"
+    return DISPATCH_MODE
+
+
+def send_to_server(cmd: str, latency: float = None):
+    """
+    Send recognized command text to Jarvis and have the reply spoken
+    server-side (no second /speak round trip). latency (end of speech →
+    dispatch, seconds) goes along so the server can report it.
+    """
+    mode = _dispatch_mode()
+    payload = {"message": cmd, "speak": True, "client": "voice"}
+    if latency is not None:
+        payload["endpoint_latency"] = latency
     try:
-        res = requests.post(SERVER_URL, json={"message": cmd})
-        data = res.json()
-        reply = data.get("reply", "")
+        if mode == "inprocess":
+            import main  # heavy import, only when running co-located
+
+            reply = main.handle_command(cmd, session="voice")
+            main.speak(reply)
+        elif mode == "socket":
+            reply = ipc.request(payload).get("reply", "")
+        else:
+            res = _get_session().post(SERVER_URL, json=payload, timeout=HTTP_TIMEOUT)
+            reply = res.json().get("reply", "")
         print(f"Jarvis reply: {reply}")
     except Exception as e:
-        print("Error talking to server:", e)
+        print(f"Error talking to server ({mode}):", e)
 
 
-def listen_command() -> str:
-    """After wake word, listen for one spoken command."""
+def listen_command(start_seq: int) -> str:
+    """
+    After wake word, record one spoken command from the shared audio
+    pipeline, starting at the frame right after the keyword.
+    """
     print("Listening for command...")
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=0.4)
-        try:
-            audio = recognizer.listen(source, timeout=6, phrase_time_limit=6)
-        except Exception as e:
-            print("Listen error (command):", e)
-            return ""
-
-    try:
-        text = recognizer.recognize_google(audio, language="en-IN")
-        text = text.lower().strip()
-        print("Heard command:", text)
-        return text
-    except Exception as e:
-        print("Speech recognition error:", e)
+    recognizer = stt.PcmStream(
+        audio_pipeline.SAMPLE_RATE,
+        on_partial=lambda partial: print("...", partial),
+    )
+    pcm = audio_pipeline.record_command(
+        start_seq,
+        timeout=6,
+        phrase_time_limit=15,
+        on_frame=recognizer.feed,
+    )
+    if not pcm:
         return ""
+    text = recognizer.finish()
+    if text:
+        print("Heard command:", text)
+    return text
 
 
 # ================== MAIN WAKE WORD LOOP ==================
@@ -70,36 +119,36 @@ def main():
         keyword_paths=[KEYWORD_PATH],
     )
 
-    pa = pyaudio.PyAudio()
-    audio_stream = pa.open(
-        rate=porcupine.sample_rate,
-        channels=1,
-        format=pyaudio.paInt16,
-        input=True,
-        frames_per_buffer=porcupine.frame_length,
-    )
+    # One microphone stream for everything (wake word + commands)
+    audio_pipeline.start(porcupine.sample_rate, porcupine.frame_length)
+    unpack_fmt = "h" * porcupine.frame_length
 
     print("Wake Word Listener Active... say 'Jarvis' 🔊")
 
     try:
+        seq = audio_pipeline.current_seq()
         while True:
-            pcm = audio_stream.read(porcupine.frame_length, exception_on_overflow=False)
-            pcm = struct.unpack_from("h" * porcupine.frame_length, pcm)
-
-            keyword_index = porcupine.process(pcm)
-            if keyword_index >= 0:
-                print("Wake word detected: JARVIS")
-                command = listen_command()
-                if command:
-                    send_to_server(command)
-                else:
-                    print("No valid command heard.")
+            for seq, pcm in audio_pipeline.frames_from(seq):
+                keyword_index = porcupine.process(struct.unpack_from(unpack_fmt, pcm))
+                if keyword_index >= 0:
+                    break
+            else:
+                print("Audio capture stopped.")
+                break
+
+            print("Wake word detected: JARVIS")
+            command = listen_command(seq + 1)
+            if command:
+                latency = vad.mark_dispatch("wake word command")
+                send_to_server(command, latency)
+            else:
+                print("No valid command heard.")
+            # Resume wake word detection after the command audio
+            seq = audio_pipeline.current_seq()
     except KeyboardInterrupt:
         print("Stopping wake word listener...")
     finally:
-        audio_stream.stop_stream()
-        audio_stream.close()
-        pa.terminate()
+        audio_pipeline.stop()
         porcupine.delete()
 
 